@@ -0,0 +1,58 @@
+"""Show that full_title and find do not call get_delimiter() and measure the cost of escaped titles.
+
+get_delimiter() is a dynamicmethod, so every call goes through the descriptor. full_title and the lookups read the
+delimiter from the root once per call instead. The call counts come from cProfile and should be 0.
+
+Run from the repository root with:
+
+    python -m benchmarks.bench_delimiter
+"""
+import cProfile
+import pstats
+
+from tnode import TNode
+
+from benchmarks.utils import make_spec, build_tnode, timeit
+
+
+def count_calls(func, name='get_delimiter'):
+    """Return the number of calls to functions with the given name while running func."""
+    profiler = cProfile.Profile()
+    profiler.runcall(func)
+    stats = pstats.Stats(profiler).stats
+    return sum(calls for (_, _, func_name), (_, calls, _, _, _) in stats.items() if func_name == name)
+
+
+def escaped_spec(spec, delim=TNode.DELIM):
+    """Return the spec with the delimiter in every title."""
+    return [(tuple(t + delim + 'x' for t in path), data) for path, data in spec]
+
+
+def main(size=10000):
+    for shape in ('balanced', 'deep'):
+        for name, spec in (('plain', make_spec(shape, size)), ('escaped', escaped_spec(make_spec(shape, size)))):
+            tree = build_tnode(spec)
+            nodes = list(tree.iter())
+            full_titles = [node.full_title for node in nodes]
+
+            def full_title():
+                return [node.full_title for node in nodes]
+
+            def find():
+                return [tree.find(key) for key in full_titles]
+
+            print('{} {}'.format(shape, name))
+            for op, func in (('full_title', full_title), ('find', find)):
+                seconds = timeit(func)
+                calls = count_calls(func)
+                print('  {:<12}{:>12,.0f} calls/sec   get_delimiter calls: {}'.format(
+                    op, len(nodes) / seconds, calls))
+
+    # Cost that full_title and find used to pay for every call
+    node = TNode('a', parent=TNode())
+    seconds = timeit(lambda: [node.get_delimiter() for _ in range(size)])
+    print('get_delimiter(){:>16,.0f} calls/sec'.format(size / seconds))
+
+
+if __name__ == '__main__':
+    main()
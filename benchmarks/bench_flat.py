@@ -0,0 +1,40 @@
+"""Compare flat {full_title: data} export and import with iter() + full_title and ParentNode.add.
+
+Run from the repository root with:
+
+    python -m benchmarks.bench_flat
+"""
+from benchmarks.utils import BenchParent, make_spec, build_parent, timeit
+
+
+def flat_with_full_title(tree):
+    return {node.full_title: node.get_data() for node in tree.iter() if len(node) == 0}
+
+
+def add_each(flat):
+    tree = BenchParent()
+    for full_title, data in flat.items():
+        tree.add(full_title, data=data, create_missing=True)
+    return tree
+
+
+def main(size=20000):
+    for shape in ('balanced', 'deep'):
+        spec = make_spec(shape, size)
+        tree = build_parent(spec)
+        flat = tree.to_flat_dict()
+        assert flat == flat_with_full_title(tree)
+
+        print('{} tree with {} nodes, {} leaves'.format(shape, size, len(flat)))
+        tests = [
+            ('iter + full_title', lambda: flat_with_full_title(tree)),
+            ('to_flat_dict', lambda: tree.to_flat_dict()),
+            ('add each full_title', lambda: add_each(flat)),
+            ('from_flat_dict', lambda: BenchParent.from_flat_dict(flat)),
+            ]
+        for name, func in tests:
+            print('  {:<22}{:>10.4f} sec'.format(name, timeit(func, repeat=3)))
+
+
+if __name__ == '__main__':
+    main()
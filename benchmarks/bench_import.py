@@ -0,0 +1,57 @@
+"""Measure how long `import tnode` takes in a new process and which heavy modules it loads.
+
+Every run starts a new interpreter with -X importtime. The bytecode is written to a temporary cache that is warmed
+first, so the time does not include compiling the source like an installed package.
+
+Run from the repository root with:
+
+    python -m benchmarks.bench_import
+"""
+import os
+import sys
+import tempfile
+import subprocess
+
+
+HEAVY = ('json', 'configparser', 'traceback', 'pathlib', 'dataclasses', 'hashlib', 'copy', 'inspect', 're')
+
+
+def run(code, env):
+    """Run the code in a new interpreter and return (import time in microseconds of tnode, stdout)."""
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], env=env, capture_output=True, text=True,
+                          check=True)
+    for line in proc.stderr.splitlines():
+        fields = line.split('|')
+        if len(fields) == 3 and fields[2].strip() == 'tnode':
+            return int(fields[1]), proc.stdout
+    return 0, proc.stdout
+
+
+def main(repeat=20):
+    with tempfile.TemporaryDirectory() as cache:
+        env = dict(os.environ, PYTHONPYCACHEPREFIX=cache)
+        env.pop('PYTHONDONTWRITEBYTECODE', None)
+
+        code = 'import sys, tnode; print(" ".join(m for m in {!r} if m in sys.modules))'.format(HEAVY)
+        run(code, env)  # Write the bytecode cache
+        times = []
+        for _ in range(repeat):
+            us, loaded = run(code, env)
+            times.append(us)
+
+        times.sort()
+        print('import tnode')
+        print('  {:<12}{:>10.2f} ms'.format('best', times[0] / 1000))
+        print('  {:<12}{:>10.2f} ms'.format('median', times[len(times) // 2] / 1000))
+        print('  {:<12}{}'.format('loaded', loaded.strip() or '(none of {})'.format(', '.join(HEAVY))))
+
+        # The first save or load registers the formats and imports what they need
+        code = ('import sys, io, tnode; tnode.ParentNode().save(io.StringIO(), ext=".ini"); '
+                'print(" ".join(m for m in {!r} if m in sys.modules))'.format(HEAVY))
+        _, loaded = run(code, env)
+        print('after save(.ini)')
+        print('  {:<12}{}'.format('loaded', loaded.strip()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+"""Measure the overhead of the reader/writer lock used by thread safe trees.
+
+Run from the repository root with:
+
+    python -m benchmarks.bench_locking
+"""
+import threading
+import time
+
+from tnode import TNode
+
+
+def build_tree(width=100, depth=3, threadsafe=False):
+    """Create a tree where every parent has `width` children `depth` levels deep."""
+    root = TNode()
+    if threadsafe:
+        root.set_threadsafe()
+
+    parents = [root]
+    for level in range(depth):
+        sub = []
+        for parent in parents:
+            for i in range(width if level == 0 else 10):
+                sub.append(TNode('node{}'.format(i), parent=parent))
+        parents = sub
+    return root
+
+
+def timeit(func, repeat=5):
+    """Return the best time of the function in seconds."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench_single_thread(threadsafe):
+    root = build_tree(threadsafe=threadsafe)
+    titles = [node.full_title for node in root.iter()][::10]
+
+    def construct():
+        build_tree(threadsafe=threadsafe)
+
+    def find():
+        for title in titles:
+            root.find(title)
+
+    def iterate():
+        for _ in root.iter():
+            pass
+
+    def to_dict():
+        root.to_dict()
+
+    return {'construct': timeit(construct), 'find': timeit(find), 'iter': timeit(iterate), 'to_dict': timeit(to_dict)}
+
+
+def bench_concurrent(readers=4, duration=0.5):
+    """Return the number of completed reads and writes while readers and one writer run together."""
+    root = build_tree(threadsafe=True)
+    movers = list(root.children[0].iter_children())
+    target = root.children[1]
+    origin = root.children[0]
+    stop = threading.Event()
+    counts = {'reads': 0, 'writes': 0}
+
+    def reader():
+        count = 0
+        while not stop.is_set():
+            list(root.iter())
+            count += 1
+        counts['reads'] += count
+
+    def writer():
+        count = 0
+        while not stop.is_set():
+            for node in movers:
+                node.parent = target if node.parent is origin else origin
+                count += 1
+        counts['writes'] += count
+
+    threads = [threading.Thread(target=reader) for _ in range(readers)] + [threading.Thread(target=writer)]
+    for th in threads:
+        th.start()
+    time.sleep(duration)
+    stop.set()
+    for th in threads:
+        th.join()
+    return counts
+
+
+def main():
+    unlocked = bench_single_thread(False)
+    locked = bench_single_thread(True)
+    print('{:<12}{:>14}{:>14}{:>10}'.format('operation', 'unlocked (s)', 'locked (s)', 'overhead'))
+    for name, value in unlocked.items():
+        print('{:<12}{:>14.5f}{:>14.5f}{:>9.1f}%'.format(name, value, locked[name], (locked[name] / value - 1) * 100))
+
+    counts = bench_concurrent()
+    print('concurrent: {reads} full iterations and {writes} moves in 0.5s'.format(**counts))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+"""Compare lookups that mostly miss using __contains__ and get against the old try/except __getitem__ pattern.
+
+Run from the repository root with:
+
+    python -m benchmarks.bench_lookup_miss
+"""
+from tnode import TNode
+
+from benchmarks.utils import make_spec, build_tnode, build_parent, timeit
+
+
+def contains_with_getitem(tree, full_title):
+    """The previous __contains__ implementation."""
+    try:
+        tree[full_title]
+        return True
+    except (IndexError, KeyError, Exception):
+        return False
+
+
+def main(size=10000, misses=0.9):
+    spec = make_spec('balanced', size)
+    tree = build_tnode(spec)
+    delim = TNode.DELIM
+
+    hits = [delim.join(path) for path, _ in spec]
+    count = int(len(hits) * misses)
+    probes = [t + delim + 'missing' if i % 2 else 'missing' + delim + t for i, t in enumerate(hits[:count])]
+    probes.extend(hits[count:])
+
+    print('{} probes, {:.0%} misses'.format(len(probes), misses))
+    results = [
+        ('getitem try/except', lambda: [contains_with_getitem(tree, p) for p in probes]),
+        ('__contains__', lambda: [p in tree for p in probes]),
+        ('get', lambda: [tree.get(p) for p in probes]),
+        ]
+    for name, func in results:
+        seconds = timeit(func)
+        print('{:<20}{:>12,.0f} probes/sec'.format(name, len(probes) / seconds))
+
+    # ParentNode.add and add_parent check if each node already exists before creating it
+    seconds = timeit(lambda: build_parent(spec), repeat=3)
+    print('{:<20}{:>12,.0f} nodes/sec'.format('ParentNode.add', len(spec) / seconds))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,40 @@
+"""Compare TNode.move with setting child.parent for many nodes.
+
+Run from the repository root with:
+
+    python -m benchmarks.bench_move
+"""
+import time
+
+from tnode import TNode
+
+from benchmarks.utils import make_spec, build_tnode
+
+
+def set_parents(nodes, new_parent):
+    for node in nodes:
+        node.parent = new_parent
+
+
+def run(name, spec, func):
+    best = float('inf')
+    for _ in range(3):
+        tree = build_tnode(spec)
+        new_parent = TNode('new_parent', parent=tree)
+        nodes = [node for node in tree.iter() if node.get_data() is not None][::2]
+        start = time.perf_counter()
+        func(tree, nodes, new_parent)
+        best = min(best, time.perf_counter() - start)
+    print('  {:<20}{:>10.4f} sec'.format(name, best))
+
+
+def main(size=20000):
+    for shape in ('balanced', 'wide'):
+        spec = make_spec(shape, size)
+        print('{} tree with {} nodes, moving every other leaf'.format(shape, size))
+        run('child.parent = ...', spec, lambda tree, nodes, new_parent: set_parents(nodes, new_parent))
+        run('move', spec, lambda tree, nodes, new_parent: tree.move(nodes, new_parent))
+
+
+if __name__ == '__main__':
+    main()
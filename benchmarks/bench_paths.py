@@ -0,0 +1,29 @@
+"""Compare resolving full_title strings with pre-split tuple and TPath keys.
+
+Run from the repository root with:
+
+    python -m benchmarks.bench_paths
+"""
+from tnode import TNode, TPath
+
+from benchmarks.utils import make_spec, build_tnode, timeit
+
+
+def main(size=10000):
+    for shape in ('balanced', 'deep'):
+        spec = make_spec(shape, size)
+        tree = build_tnode(spec)
+        delim = TNode.DELIM
+
+        strings = [delim.join(path) for path, _ in spec]
+        tuples = [path for path, _ in spec]
+        paths = [TPath(path) for path, _ in spec]
+
+        print(shape)
+        for name, keys in (('str', strings), ('tuple', tuples), ('TPath', paths)):
+            seconds = timeit(lambda: [tree.get(key) for key in keys])
+            print('  {:<8}{:>12,.0f} lookups/sec'.format(name, len(keys) / seconds))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""Compare the flat TNode pickle protocol with Python's default recursive pickling.
+
+Run from the repository root with:
+
+    python -m benchmarks.bench_pickle
+"""
+import pickle
+import time
+
+from tnode import TNode
+
+
+class DefaultPickleNode(TNode):
+    """TNode that pickles its __dict__ the default way, following _parent and _children recursively."""
+    def __reduce__(self):
+        return object.__new__, (self.__class__,), self.__dict__
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+
+
+def build_wide(cls, width=100, leaves=20):
+    root = cls()
+    for i in range(width):
+        parent = cls('parent{}'.format(i), parent=root)
+        for j in range(leaves):
+            cls('leaf{}'.format(j), parent=parent, data=j)
+    return root
+
+
+def build_deep(cls, depth=5000):
+    root = node = cls()
+    for i in range(depth):
+        node = cls('node{}'.format(i), parent=node, data=i)
+    return root
+
+
+def round_trip(obj, repeat=5):
+    """Return the pickled size in bytes and the best round trip time in seconds."""
+    best = float('inf')
+    size = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        data = pickle.dumps(obj, pickle.HIGHEST_PROTOCOL)
+        pickle.loads(data)
+        best = min(best, time.perf_counter() - start)
+        size = len(data)
+    return size, best
+
+
+def report(name, func):
+    try:
+        size, seconds = func()
+        print('{:<32}{:>12,}{:>12.5f}'.format(name, size, seconds))
+    except RecursionError:
+        print('{:<32}{:>24}'.format(name, 'RecursionError'))
+
+
+def main():
+    print('{:<32}{:>12}{:>12}'.format('case', 'bytes', 'seconds'))
+    for cls in (DefaultPickleNode, TNode):
+        wide = build_wide(cls)
+        leaf = wide['parent50 > leaf10']
+        report('{} wide tree'.format(cls.__name__), lambda: round_trip(wide))
+        report('{} single leaf'.format(cls.__name__), lambda: round_trip(leaf))
+        report('{} deep tree'.format(cls.__name__), lambda: round_trip(build_deep(cls)))
+
+
+if __name__ == '__main__':
+    main()
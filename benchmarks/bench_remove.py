@@ -0,0 +1,51 @@
+"""Compare clear() and remove_children() with removing children one at a time.
+
+Run from the repository root with:
+
+    python -m benchmarks.bench_remove
+"""
+import time
+
+from tnode import TNode
+
+from benchmarks.utils import make_spec, build_tnode
+
+
+def build_wide(size):
+    tree = TNode()
+    tree.add_children(TNode('leaf{}'.format(i), data=i) for i in range(size))
+    return tree
+
+
+def remove_each(tree, children):
+    for child in children:
+        tree.remove_child(child)
+
+
+def run(name, build, func):
+    best = float('inf')
+    for _ in range(3):
+        tree = build()
+        start = time.perf_counter()
+        func(tree)
+        best = min(best, time.perf_counter() - start)
+    print('  {:<30}{:>10.4f} sec'.format(name, best))
+
+
+def main(size=5000):
+    print('wide tree with {} children'.format(size))
+    build = lambda: build_wide(size)
+    run('remove_child every other', build, lambda t: remove_each(t, t.children[::2]))
+    run('remove_children every other', build, lambda t: t.remove_children(t.children[::2]))
+    run('remove_child all', build, lambda t: remove_each(t, t.children))
+    run('clear', build, lambda t: t.clear())
+
+    print('balanced tree with {} nodes'.format(size))
+    spec = make_spec('balanced', size)
+    build = lambda: build_tnode(spec)
+    run('clear', build, lambda t: t.clear())
+    run('clear(destroy=True)', build, lambda t: t.clear(destroy=True))
+
+
+if __name__ == '__main__':
+    main()
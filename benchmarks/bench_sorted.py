@@ -0,0 +1,42 @@
+"""Compare title lookups and inserts in a wide parent with and without sorted children.
+
+Run from the repository root with:
+
+    python -m benchmarks.bench_sorted
+"""
+import random
+
+from tnode import TNode
+
+from benchmarks.utils import timeit
+
+
+def build(titles, sort_key=None):
+    tree = TNode()
+    if sort_key is not None:
+        tree.set_sort_key(sort_key)
+    for title in titles:
+        TNode(title, parent=tree)
+    return tree
+
+
+def main(size=10000):
+    titles = ['node{:06d}'.format(i) for i in range(size)]
+    random.Random(0).shuffle(titles)
+    probes = titles[::10]
+
+    print('wide parent with {} children'.format(size))
+    for name, sort_key in (('insertion order', None), ('sorted by title', 'title')):
+        seconds = timeit(lambda: build(titles, sort_key), repeat=3)
+        tree = build(titles, sort_key)
+        lookup = timeit(lambda: [tree[title] for title in probes])
+        print('  {:<18} build {:>12,.0f} nodes/sec   lookup {:>12,.0f} titles/sec'.format(
+            name, size / seconds, len(probes) / lookup))
+
+    tree = build(titles, 'title')
+    seconds = timeit(lambda: tree.child_range('node001000', 'node002000'))
+    print('  {:<18} {:>12,.0f} ranges/sec'.format('child_range', 1 / seconds))
+
+
+if __name__ == '__main__':
+    main()
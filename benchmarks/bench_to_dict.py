@@ -0,0 +1,33 @@
+"""Time full and partial to_dict exports.
+
+Run from the repository root with:
+
+    python -m benchmarks.bench_to_dict
+"""
+from tnode import TNode
+
+from benchmarks.utils import make_spec, build_tnode, timeit
+
+
+def main(size=50000):
+    spec = make_spec('balanced', size)
+    tree = build_tnode(spec)
+    delim = TNode.DELIM
+    titles = [delim.join(path) for path, data in spec if data is not None]
+    exclude = titles[::10]
+
+    print('balanced tree with {} nodes'.format(size))
+    tests = [
+        ('full', lambda: tree.to_dict()),
+        ('exclude {} titles'.format(len(exclude)), lambda: tree.to_dict(exclude=exclude)),
+        ('exclude prefix', lambda: tree.to_dict(exclude=['node1*'])),
+        ('include one branch', lambda: tree.to_dict(include=['node1 > node2'])),
+        ('max_depth=2', lambda: tree.to_dict(max_depth=2)),
+        ('fields=[title]', lambda: tree.to_dict(fields=['title'])),
+        ]
+    for name, func in tests:
+        print('  {:<24}{:>10.4f} sec'.format(name, timeit(func, repeat=3)))
+
+
+if __name__ == '__main__':
+    main()
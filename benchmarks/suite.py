@@ -0,0 +1,147 @@
+"""Benchmark suite for construction, lookup, traversal and file I/O.
+
+Run from the repository root with:
+
+    python -m benchmarks.suite --size 10000 --output results.json
+    python -m benchmarks.suite --size 10000 --baseline results.json
+
+Results are saved as json {'meta': {...}, 'results': {shape: {operation: {'ops_per_sec', 'seconds', 'ops',
+'peak_bytes'}}}}. When a baseline is given every operation is compared with the baseline and the exit code is 1 if any
+operation is slower than the allowed tolerance.
+"""
+import os
+import sys
+import json
+import argparse
+import platform
+import tempfile
+
+import tnode
+from tnode import TNode
+
+from benchmarks.utils import SHAPES, BenchParent, make_spec, build_tnode, build_parent, timeit, peak_memory
+
+
+def get_operations(spec, tmpdir):
+    """Return a dictionary of {name: (func, number of operations)} for the given tree spec."""
+    delim = TNode.DELIM
+    tree = build_tnode(spec)
+    ptree = build_parent(spec)
+    nodes = list(tree.iter())
+    full_titles = [delim.join(path) for path, _ in spec]
+    tree_dict = tree.to_dict()
+    json_file = os.path.join(tmpdir, 'bench.json')
+    ini_file = os.path.join(tmpdir, 'bench.ini')
+    ptree.save(json_file)
+    ptree.save(ini_file)
+
+    def copy_dict():
+        return json.loads(json.dumps(tree_dict))  # from_dict pops keys
+
+    return {
+        'add_child': (lambda: build_tnode(spec), len(spec)),
+        'parent_add': (lambda: build_parent(spec), len(spec)),
+        'find': (lambda: [tree.find(t) for t in full_titles], len(full_titles)),
+        'getitem': (lambda: [tree[t] for t in full_titles], len(full_titles)),
+        'iter': (lambda: list(tree.iter()), len(nodes)),
+        'iter_nearest': (lambda: list(tree.iter_nearest()), len(nodes)),
+        'full_title': (lambda: [n.full_title for n in nodes], len(nodes)),
+        'to_dict': (lambda: tree.to_dict(), len(nodes)),
+        'from_dict': (lambda: TNode.from_dict(copy_dict()), len(nodes)),
+        'save_json': (lambda: ptree.save(json_file), len(nodes)),
+        'load_json': (lambda: BenchParent.load(json_file), len(nodes)),
+        'save_ini': (lambda: ptree.save(ini_file), len(nodes)),
+        'load_ini': (lambda: BenchParent.load(ini_file), len(nodes)),
+        }
+
+
+def run(shapes=SHAPES, size=10000, repeat=3, operations=None, memory=True):
+    """Run the benchmarks and return the results dictionary."""
+    results = {}
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for shape in shapes:
+            spec = make_spec(shape, size)
+            ops = get_operations(spec, tmpdir)
+            results[shape] = {}
+            for name, (func, count) in ops.items():
+                if operations and name not in operations:
+                    continue
+                seconds = timeit(func, repeat)
+                results[shape][name] = {
+                    'ops': count,
+                    'seconds': seconds,
+                    'ops_per_sec': count / seconds if seconds > 0 else float('inf'),
+                    'peak_bytes': peak_memory(func) if memory else None,
+                    }
+
+    meta = {
+        'tnode_version': tnode.__version__,
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'size': size,
+        'repeat': repeat,
+        }
+    return {'meta': meta, 'results': results}
+
+
+def compare(results, baseline, tolerance=0.1):
+    """Return a list of (shape, operation, ratio, regressed) comparing ops/sec with the baseline."""
+    rows = []
+    for shape, ops in results['results'].items():
+        for name, value in ops.items():
+            try:
+                base = baseline['results'][shape][name]['ops_per_sec']
+            except KeyError:
+                continue
+            ratio = value['ops_per_sec'] / base
+            rows.append((shape, name, ratio, ratio < 1 - tolerance))
+    return rows
+
+
+def print_results(results, comparison=None):
+    ratios = {(shape, name): (ratio, regressed) for shape, name, ratio, regressed in (comparison or [])}
+    print('{:<10}{:<14}{:>14}{:>14}{:>10}'.format('shape', 'operation', 'ops/sec', 'peak KiB', 'baseline'))
+    for shape, ops in results['results'].items():
+        for name, value in ops.items():
+            peak = value['peak_bytes']
+            ratio, regressed = ratios.get((shape, name), (None, False))
+            print('{:<10}{:<14}{:>14,.0f}{:>14}{:>10}{}'.format(
+                shape, name, value['ops_per_sec'],
+                '' if peak is None else '{:,.0f}'.format(peak / 1024),
+                '' if ratio is None else '{:.2f}x'.format(ratio),
+                '  REGRESSION' if regressed else ''))
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description='Run the tnode benchmark suite.')
+    parser.add_argument('--size', type=int, default=10000, help='Number of nodes in each tree.')
+    parser.add_argument('--shapes', nargs='+', default=list(SHAPES), choices=SHAPES, help='Tree shapes to run.')
+    parser.add_argument('--operations', nargs='+', default=None, help='Only run these operations.')
+    parser.add_argument('--repeat', type=int, default=3, help='Number of times to run each operation.')
+    parser.add_argument('--no-memory', action='store_true', help='Do not measure the peak memory.')
+    parser.add_argument('--output', default=None, help='Save the results to this json file.')
+    parser.add_argument('--baseline', default=None, help='Compare the results with this json file.')
+    parser.add_argument('--tolerance', type=float, default=0.1, help='Allowed slowdown before a regression.')
+    args = parser.parse_args(args)
+
+    results = run(args.shapes, args.size, args.repeat, args.operations, memory=not args.no_memory)
+
+    comparison = None
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            comparison = compare(results, json.load(f), args.tolerance)
+
+    print_results(results, comparison)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if comparison and any(regressed for *_, regressed in comparison):
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,126 @@
+"""Shared tree generators and timers for the benchmarks."""
+import gc
+import time
+import tracemalloc
+
+from tnode import TNode, ParentNode, ChildNode
+
+
+__all__ = ['BenchParent', 'BenchChild', 'SHAPES', 'make_spec', 'build_tnode', 'build_parent', 'timeit', 'peak_memory']
+
+
+class BenchParent(ParentNode):
+    PARENT_TYPES = []
+    CHILD_TYPES = []
+
+
+class BenchChild(ChildNode):
+    PARENT_TYPES = []
+    CHILD_TYPES = []
+
+
+BenchParent.register_child_type(BenchChild)  # Register the child type first!
+BenchParent.register_child_type(BenchParent)
+BenchParent.register_parent_type(BenchParent)
+BenchChild.register_parent_type(BenchParent)
+
+
+def make_spec(shape='balanced', size=10000, branching=10, depth=50):
+    """Return a list of (path tuple, data) in iteration order for a tree with about `size` nodes.
+
+    Args:
+        shape (str)['balanced']: 'wide' for one parent with every node, 'deep' for chains that are `depth` levels
+            deep, or 'balanced' for parents with `branching` children.
+        size (int)[10000]: Number of nodes.
+        branching (int)[10]: Number of children for each parent in a balanced tree.
+        depth (int)[50]: Length of each chain in a deep tree.
+
+    Returns:
+        spec (list): List of (path, data) where data is None for parents.
+    """
+    spec = []
+    if shape == 'wide':
+        spec.extend((('leaf{}'.format(i),), i) for i in range(size))
+
+    elif shape == 'deep':
+        count = 0
+        chain = 0
+        while count < size:
+            path = ()
+            for level in range(min(depth, size - count) - 1):
+                path = path + ('chain{}'.format(chain) if level == 0 else 'level{}'.format(level),)
+                spec.append((path, None))
+                count += 1
+            spec.append((path + ('leaf',), count))
+            count += 1
+            chain += 1
+
+    elif shape == 'balanced':
+        levels = [()]
+        while len(spec) < size:
+            next_levels = []
+            for parent in levels:
+                for i in range(branching):
+                    if len(spec) >= size:
+                        break
+                    next_levels.append(parent + ('node{}'.format(i),))
+                    spec.append((next_levels[-1], None))
+            levels = next_levels
+
+        # The deepest nodes are leaves with data
+        parents = {path[:-1] for path, _ in spec}
+        spec = [(path, i if path not in parents else None) for i, (path, _) in enumerate(spec)]
+        spec = sorted(spec, key=lambda item: item[0])  # Iteration (pre) order
+
+    else:
+        raise ValueError('Invalid shape {!r}!'.format(shape))
+
+    return spec
+
+
+SHAPES = ('wide', 'deep', 'balanced')
+
+
+def build_tnode(spec, cls=TNode):
+    """Create a TNode tree from a spec using add_child."""
+    root = cls()
+    nodes = {(): root}
+    for path, data in spec:
+        node = cls(path[-1], data=data)
+        nodes[path[:-1]].add_child(node)
+        nodes[path] = node
+    return root
+
+
+def build_parent(spec, cls=BenchParent, delim=TNode.DELIM):
+    """Create a ParentNode tree from a spec using add_parent and add with full titles."""
+    root = cls()
+    for path, data in spec:
+        full_title = delim.join(path)
+        if data is None:
+            root.add_parent(full_title)
+        else:
+            root.add(full_title, data=data)
+    return root
+
+
+def timeit(func, repeat=5):
+    """Return the best time of the function in seconds."""
+    best = float('inf')
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def peak_memory(func):
+    """Return the peak number of bytes allocated while running the function."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
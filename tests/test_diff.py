@@ -0,0 +1,118 @@
+def test_no_changes():
+    from tnode import TNode
+
+    old = TNode()
+    parent1 = TNode('parent1', parent=old)
+    parent2 = TNode('parent2', parent=old)
+    subparent2 = TNode('subparent2', parent=parent2)
+    TNode('child6', parent=subparent2, data=6)
+    TNode('child7', parent=subparent2, data=7)
+    TNode('child1', parent=parent2, data=1)
+    TNode('child2', parent=parent1, data=2)
+    subparent1 = TNode('subparent1', parent=parent1)
+    TNode('child4', parent=subparent1, data=4)
+    TNode('child5', parent=subparent1, data=5)
+    new = old.clone()
+
+    assert list(old.diff(new)) == []
+    assert list(new.diff(old)) == []
+
+
+def test_diff():
+    from tnode import TNode
+
+    old = TNode()
+    parent1 = TNode('parent1', parent=old)
+    parent2 = TNode('parent2', parent=old)
+    subparent2 = TNode('subparent2', parent=parent2)
+    TNode('child6', parent=subparent2, data=6)
+    TNode('child7', parent=subparent2, data=7)
+    TNode('child1', parent=parent2, data=1)
+    TNode('child2', parent=parent1, data=2)
+    subparent1 = TNode('subparent1', parent=parent1)
+    TNode('child4', parent=subparent1, data=4)
+    TNode('child5', parent=subparent1, data=5)
+    new = old.clone()
+
+    new['parent2 > child1'].set_data(10)
+    new['parent1 > subparent1'].title = 'renamed1'
+    new['parent2 > subparent2 > child6'].parent = new['parent1']
+    new['parent2 > subparent2'].remove_child(new['parent2 > subparent2 > child7'])
+    new['parent1 > child2'].add_child(type(new)('child3', data=3))
+
+    changes = sorted((c.kind, c.full_title) for c in old.diff(new))
+    assert changes == sorted([
+        ('data', 'parent2 > child1'),
+        ('renamed', 'parent1 > renamed1'),
+        ('moved', 'parent1 > child6'),
+        ('removed', 'parent2 > subparent2 > child7'),
+        ('added', 'parent1 > child2 > child3'),
+        ])
+
+    for change in old.diff(new):
+        if change.kind == 'renamed':
+            assert change.old.full_title == 'parent1 > subparent1'
+            assert change.new.full_title == 'parent1 > renamed1'
+        elif change.kind == 'moved':
+            assert change.old.full_title == 'parent2 > subparent2 > child6'
+        elif change.kind == 'removed':
+            assert change.new is None
+        elif change.kind == 'added':
+            assert change.old is None
+            assert change.new.get_data() == 3
+        elif change.kind == 'data':
+            assert change.old.get_data() == 1
+            assert change.new.get_data() == 10
+
+
+def test_digest():
+    from tnode import TNode
+
+    old = TNode()
+    parent1 = TNode('parent1', parent=old)
+    parent2 = TNode('parent2', parent=old)
+    subparent2 = TNode('subparent2', parent=parent2)
+    TNode('child6', parent=subparent2, data=6)
+    TNode('child7', parent=subparent2, data=7)
+    TNode('child1', parent=parent2, data=1)
+    TNode('child2', parent=parent1, data=2)
+    subparent1 = TNode('subparent1', parent=parent1)
+    TNode('child4', parent=subparent1, data=4)
+    TNode('child5', parent=subparent1, data=5)
+    new = old.clone()
+
+    assert old.digest() == new.digest()
+    assert old['parent1'].digest() != old['parent2'].digest()
+
+    # Cached until something below changes
+    digest = old.digest()
+    parent2_digest = old['parent2'].content_digest()
+    assert old._content_digest is not None
+    old['parent1 > subparent1 > child4'].set_data(40)
+    assert old._content_digest is None
+    assert old['parent1']._content_digest is None
+    assert old['parent2'].content_digest() is parent2_digest  # Unchanged path keeps its digest
+    assert old.digest() != digest
+
+    old['parent1 > subparent1 > child4'].set_data(4)
+    assert old.digest() == digest
+
+    # Titles are part of the digest, but not the content digest
+    node = old['parent1 > child2']
+    content, full = node.content_digest(), node.digest()
+    node.title = 'other'
+    assert node.content_digest() == content
+    assert node.digest() != full
+    assert old.digest() != digest
+
+    # Structural changes
+    node.title = 'child2'
+    assert old.digest() == digest
+    old['parent2 > child1'].parent = old['parent1']
+    assert old.digest() != digest
+
+
+if __name__ == '__main__':
+    test_no_changes()
+    test_diff()
+    test_digest()
@@ -0,0 +1,127 @@
+import os
+import pickle
+
+
+def test_loader():
+    from tnode import LazyNode
+
+    calls = []
+
+    def loader(node):
+        calls.append(node.title)
+        return [LazyNode('child{}'.format(i), data=i) for i in range(3)]
+
+    t = LazyNode()
+    parent1 = LazyNode('parent1', parent=t, loader=loader)
+    assert not parent1.is_loaded()
+    assert calls == []
+
+    assert len(parent1) == 3
+    assert parent1.is_loaded()
+    assert calls == ['parent1']
+    assert t['parent1 > child2'].get_data() == 2
+    assert t['parent1 > child2'].parent is parent1
+    assert calls == ['parent1']  # Only loaded once
+
+    parent2 = LazyNode('parent2', parent=t, loader=loader)
+    assert t.find('parent2 > child1').get_data() == 1
+    parent3 = LazyNode('parent3', parent=t, loader=loader)
+    assert [ch.title for ch in parent3.iter_children()] == ['child0', 'child1', 'child2']
+    assert calls == ['parent1', 'parent2', 'parent3']
+
+
+def test_lazy_from_dict(remove_file=True):
+    from tnode import TNode, LazyNode
+
+    t = TNode()
+    parent1 = TNode('parent1', parent=t)
+    parent2 = TNode('parent2', parent=t)
+    subparent2 = TNode('subparent2', parent=parent2)
+    TNode('child6', parent=subparent2, data=6)
+    TNode('child1', parent=parent2, data=1)
+    TNode('child2', parent=parent1, data=2)
+
+    lazy = LazyNode.from_dict(t.to_dict())
+    assert not lazy.is_loaded()
+    parent2 = lazy['parent2']
+    assert lazy.is_loaded()
+    assert not parent2.is_loaded()
+    assert not lazy['parent1'].is_loaded()
+    assert lazy['parent2 > subparent2 > child6'].get_data() == 6
+    assert parent2.is_loaded()
+    assert not lazy['parent1'].is_loaded()
+    assert lazy.to_dict() == t.to_dict()
+
+    filename = 'test_lazy_from_json.json'
+    try:
+        t.save(filename)
+        lazy = LazyNode.load(filename)
+        assert isinstance(lazy, LazyNode)
+        assert not lazy.is_loaded()
+        assert lazy.to_dict() == t.to_dict()
+    finally:
+        try:
+            if remove_file:
+                os.remove(filename)
+        except (OSError, Exception):
+            pass
+
+    # Pickle and clone load the children
+    lazy = LazyNode.from_dict(t.to_dict())
+    assert pickle.loads(pickle.dumps(lazy)).to_dict() == t.to_dict()
+    lazy = LazyNode.from_dict(t.to_dict())
+    copied = lazy.clone()
+    assert copied.to_dict() == t.to_dict()
+    assert copied['parent2']._children is not lazy['parent2']._children
+
+    # Clearing does not load children that were never used
+    lazy = LazyNode.from_dict(t.to_dict())
+    lazy.clear(destroy=True)
+    assert lazy.is_loaded() and len(lazy) == 0
+
+
+def test_load_failure_and_threads():
+    import time
+    import threading
+    from tnode import LazyNode
+
+    # A loader that raises leaves the node unloaded, so the loader runs again
+    attempts = []
+
+    def failing_loader(node):
+        attempts.append(1)
+        yield LazyNode('child0')
+        if len(attempts) == 1:
+            raise ValueError('Read error')
+        yield LazyNode('child1')
+
+    node = LazyNode('node', loader=failing_loader)
+    try:
+        len(node)
+        raise AssertionError('The loader error should be raised!')
+    except ValueError:
+        pass
+    assert not node.is_loaded()
+    assert len(node) == 2 and len(attempts) == 2
+
+    # Readers wait for the loader instead of seeing a partly loaded node
+    def slow_loader(node):
+        for i in range(5):
+            time.sleep(0.01)
+            yield LazyNode('child{}'.format(i))
+
+    for _ in range(3):
+        node = LazyNode('node', loader=slow_loader)
+        sizes = []
+        threads = [threading.Thread(target=lambda: sizes.append(len(node))) for _ in range(4)]
+        for th in threads:
+            th.start()
+        for th in threads:
+            th.join()
+        assert sizes == [5, 5, 5, 5]
+
+
+if __name__ == '__main__':
+    test_loader()
+    test_lazy_from_dict()
+    test_load_failure_and_threads()
@@ -0,0 +1,124 @@
+import threading
+
+
+def test_rwlock():
+    from tnode import RWLock
+
+    lock = RWLock()
+    with lock.read:
+        with lock.read:  # Reentrant read
+            pass
+        try:
+            lock.acquire_write()
+            raise AssertionError('A read lock cannot be upgraded to a write lock!')
+        except RuntimeError:
+            pass
+
+    with lock.write:
+        with lock.write:  # Reentrant write
+            with lock.read:  # Writer can read
+                pass
+
+    # Readers run together
+    readers_in = threading.Barrier(2, timeout=5)
+
+    def reader():
+        with lock.read:
+            readers_in.wait()
+
+    threads = [threading.Thread(target=reader) for _ in range(2)]
+    for th in threads:
+        th.start()
+    for th in threads:
+        th.join()
+    assert not readers_in.broken
+
+
+def test_threadsafe_tree():
+    from tnode import TNode
+
+    t = TNode()
+    parent1 = TNode('parent1', parent=t)
+    parent2 = TNode('parent2', parent=t)
+    children = [TNode('child{}'.format(i), parent=parent1) for i in range(50)]
+
+    assert not t.is_threadsafe()
+    parent1.set_threadsafe()  # Lock is stored on the root
+    assert t.is_threadsafe()
+    assert parent2.is_threadsafe()
+    assert t.get_lock() is parent2.get_lock()
+
+    errors = []
+    stop = threading.Event()
+
+    def writer():
+        try:
+            for _ in range(20):
+                for child in children:
+                    child.parent = parent2 if child.parent is parent1 else parent1
+        except Exception as err:
+            errors.append(err)
+        finally:
+            stop.set()
+
+    def reader():
+        try:
+            while not stop.is_set():
+                nodes = list(t.iter())
+                assert len(nodes) == len(children) + 2
+
+                with t.read_lock():
+                    for node in t.iter():
+                        assert node.parent is t or node in node.parent.children
+                t.to_dict()
+        except Exception as err:
+            errors.append(err)
+
+    threads = [threading.Thread(target=writer)] + [threading.Thread(target=reader) for _ in range(3)]
+    for th in threads:
+        th.start()
+    for th in threads:
+        th.join()
+    assert errors == [], errors
+
+    # Modifying the tree while iterating is allowed, because iter collects the nodes under the read lock
+    for child in t.iter():
+        if child.parent is parent2:
+            child.parent = parent1
+    assert len(parent1) == len(children)
+
+    t.set_threadsafe(False)
+    assert not parent1.is_threadsafe()
+
+
+
+def test_set_data_write_lock():
+    from tnode import TNode
+
+    t = TNode()
+    child = TNode('child', parent=t)
+    t.set_threadsafe()
+    try:
+        th = threading.Thread(target=child.set_data, args=(1,))
+        with t.read_lock():
+            th.start()
+            th.join(0.1)
+            assert th.is_alive() and child.data is None  # Waits for the reader
+        th.join()
+        assert child.data == 1
+
+        # Data can still be set before TNode.__init__ while a tree is thread safe
+        class Child(TNode):
+            def __init__(self, title='', data=None, parent=None, **kwargs):
+                self.data = data
+                super().__init__(title=title, parent=parent, **kwargs)
+
+        assert Child('c', data=2).data == 2
+    finally:
+        t.set_threadsafe(False)
+
+
+if __name__ == '__main__':
+    test_rwlock()
+    test_threadsafe_tree()
+    test_set_data_write_lock()
@@ -0,0 +1,132 @@
+def test_subscribe():
+    from tnode import TNode
+    from tnode.observers import SUBSCRIBED
+
+    t = TNode()
+    parent1 = TNode('parent1', parent=t)
+    child1 = TNode('child1', parent=parent1)
+
+    calls = []
+    t.subscribe(calls.append)
+    direct = []
+    t.subscribe(direct.append, subtree=False)
+
+    child2 = TNode('child2', parent=parent1)
+    assert [(e.kind, e.node, e.value) for e in calls[-1]] == [('child_added', parent1, child2)]
+
+    child1.set_data(1)
+    assert [(e.kind, e.node, e.value) for e in calls[-1]] == [('data', child1, 1)]
+
+    child1.title = 'new title'
+    assert [(e.kind, e.node, e.value) for e in calls[-1]] == [('title', child1, 'child1')]
+
+    child2.parent = t
+    assert [(e.kind, e.node, e.value) for e in calls[-2]] == [('child_removed', parent1, child2)]
+    assert [(e.kind, e.node, e.value) for e in calls[-1]] == [('child_added', t, child2)]
+
+    # Direct observers only see changes to the node itself
+    assert [[(e.kind, e.node) for e in events] for events in direct] == [[('child_added', t)]]
+
+    # Unsubscribe
+    count = len(calls)
+    t.unsubscribe(calls.append)
+    child1.set_data(2)
+    assert len(calls) == count
+    t.unsubscribe(direct.append)
+    assert id(t) not in SUBSCRIBED
+
+
+def test_batch():
+    from tnode import TNode
+
+    t = TNode()
+    parent1 = TNode('parent1', parent=t)
+
+    calls = []
+    t.subscribe(calls.append)
+    parent1.subscribe(calls.append)
+    try:
+        with t.batch():
+            children = [TNode('child{}'.format(i), parent=parent1, data=i) for i in range(10)]
+            with TNode.batch():  # Nested batches are delivered by the outermost batch
+                parent1.clear()
+            assert calls == []
+
+        # One call with every event from both subscriptions
+        assert len(calls) == 1
+        kinds = [e.kind for e in calls[0]]
+        assert kinds.count('child_added') == 20
+        assert kinds.count('child_removed') == 20
+
+        # add_children sends one batch
+        calls.clear()
+        parent1.add_children(children)
+        assert len(calls) == 1
+        assert [e.value for e in calls[0]][::2] == children  # Each event is delivered for both subscriptions
+    finally:
+        t.unsubscribe(calls.append)
+        parent1.unsubscribe(calls.append)
+
+
+def test_destroyed_and_collected_observers():
+    import gc
+    from tnode import TNode
+    from tnode.observers import SUBSCRIBED
+
+    t = TNode()
+    child = TNode('child', parent=t)
+    calls = []
+    child.subscribe(calls.append)
+    assert id(child) in SUBSCRIBED
+
+    # Destroyed nodes lose their observers
+    t.destroy()
+    assert id(child) not in SUBSCRIBED
+    child.set_data(1)
+    assert calls == []
+
+    # Garbage collected nodes are forgotten
+    t = TNode()
+    child = TNode('child', parent=t)
+    child.subscribe(calls.append)
+    key = id(child)
+    assert key in SUBSCRIBED
+    del t, child
+    gc.collect()
+    assert key not in SUBSCRIBED
+
+
+def test_partly_initialised_nodes():
+    from tnode import TNode, ParentNode, ChildNode
+
+    class Parent(ParentNode):
+        PARENT_TYPES = []
+        CHILD_TYPES = []
+
+    class Child(ChildNode):
+        PARENT_TYPES = []
+        CHILD_TYPES = []
+
+        def __init__(self, title='', data=None, parent=None, **kwargs):
+            self.data = data  # Set before TNode.__init__ creates the parent attribute
+            super().__init__(title=title, parent=parent, **kwargs)
+
+    Parent.register_child_type(Child)
+    Child.register_parent_type(Parent)
+
+    other = TNode()
+    calls = []
+    other.subscribe(calls.append)
+    try:
+        top = Parent()
+        b = top.add('b', data=2)
+        assert b.data == 2 and top['b'] is b
+    finally:
+        other.unsubscribe(calls.append)
+
+
+if __name__ == '__main__':
+    test_subscribe()
+    test_batch()
+    test_destroyed_and_collected_observers()
+    test_partly_initialised_nodes()
@@ -0,0 +1,106 @@
+import operator
+from concurrent.futures import ThreadPoolExecutor
+
+
+def test_split_leaves():
+    from tnode import TNode
+    from tnode.parallel import split_leaves
+
+    t = TNode()
+    value = 0
+    for i in range(5):
+        parent = TNode('parent{}'.format(i), parent=t)
+        for j in range(i * 3):
+            sub = TNode('sub{}'.format(j), parent=parent)
+            for k in range(4):
+                TNode('child{}'.format(k), parent=sub, data=value)
+                value += 1
+        TNode('leaf', parent=parent, data=-i)
+
+    leaves = [n for n in t.iter() if n.has_data()]
+
+    for chunk, workers in (('subtree', 1), ('subtree', 2), ('subtree', 100), (7, None)):
+        chunks = split_leaves(t, chunk, workers)
+        assert [n for nodes in chunks for n in nodes] == leaves
+
+    chunks = split_leaves(t, 7)
+    assert all(len(nodes) == 7 for nodes in chunks[:-1])
+
+    try:
+        split_leaves(t, 'abc')
+        raise AssertionError('Invalid chunk type should raise a ValueError!')
+    except ValueError:
+        pass
+
+    for chunk in (0, -1):
+        try:
+            split_leaves(t, chunk)
+            raise AssertionError('Chunk sizes below 1 should raise a ValueError!')
+        except ValueError:
+            pass
+
+    # The given node is not included in any mode
+    r = TNode('r', data=100)
+    b = TNode('b', parent=TNode('a', parent=r, data=1), data=2)
+    for chunk in ('subtree', 1):
+        assert [n.title for nodes in split_leaves(r, chunk) for n in nodes] == ['a', 'b']
+    with ThreadPoolExecutor(2) as executor:
+        r.parallel_map(operator.neg, executor=executor)
+    assert (r.data, b.data) == (100, -2)
+
+
+def test_parallel_map_reduce():
+    from tnode import TNode
+
+    t = TNode()
+    value = 0
+    for i in range(5):
+        parent = TNode('parent{}'.format(i), parent=t)
+        for j in range(i * 3):
+            sub = TNode('sub{}'.format(j), parent=parent)
+            for k in range(4):
+                TNode('child{}'.format(k), parent=sub, data=value)
+                value += 1
+        TNode('leaf', parent=parent, data=-i)
+
+    expected = {n.full_title: abs(n.get_data()) for n in t.iter() if n.has_data()}
+
+    with ThreadPoolExecutor(2) as executor:
+        t.parallel_map(abs, executor=executor)
+    assert {n.full_title: n.get_data() for n in t.iter() if n.has_data()} == expected
+
+    total = sum(expected.values())
+    with ThreadPoolExecutor(3) as executor:
+        assert t.parallel_reduce(abs, operator.add, executor=executor) == total
+        assert t.parallel_reduce(abs, operator.add, initial=10, executor=executor, chunk=5) == total + 10
+
+        # None is a valid initial value
+        r = TNode('r')
+        TNode('b', parent=TNode('a', parent=r, data=1), data=2)
+        assert r.parallel_reduce(abs, lambda a, b: (a, b), initial=None, executor=executor, chunk=1) == ((None, 1), 2)
+
+
+def test_process_pool():
+    from tnode import TNode
+
+    t = TNode()
+    value = 0
+    for i in range(5):
+        parent = TNode('parent{}'.format(i), parent=t)
+        for j in range(i * 3):
+            sub = TNode('sub{}'.format(j), parent=parent)
+            for k in range(4):
+                TNode('child{}'.format(k), parent=sub, data=value)
+                value += 1
+        TNode('leaf', parent=parent, data=-i)
+
+    total = sum(abs(n.get_data()) for n in t.iter() if n.has_data())
+
+    t.parallel_map(abs)
+    assert t.parallel_reduce(abs, operator.add) == total
+
+
+if __name__ == '__main__':
+    test_split_leaves()
+    test_parallel_map_reduce()
+    test_process_pool()
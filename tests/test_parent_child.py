@@ -178,7 +178,268 @@ def test_ini(remove_file=True):
             pass
 
 
+def test_type_registration_cache():
+    class CacheParent(ParentNode):
+        PARENT_TYPES = []
+        CHILD_TYPES = []
+
+    class CacheChild(ChildNode):
+        PARENT_TYPES = []
+        CHILD_TYPES = []
+
+    # Duplicates are not added
+    CacheParent.register_child_type(CacheChild)
+    CacheParent.register_child_type(CacheChild)
+    assert CacheParent.CHILD_TYPES == [CacheChild]
+
+    top = CacheParent('')
+    try:
+        top.add_child(CacheChild('child1'))
+        raise AssertionError('CacheChild does not have a registered parent type!')
+    except TypeError:
+        pass
+
+    # Registering must invalidate the cached result
+    CacheChild.register_parent_type(CacheParent)
+    child1 = top.add_child(CacheChild('child1'))
+    assert child1.parent is top
+
+    CacheParent.remove_child_type(CacheChild)
+    try:
+        top.add_child(CacheChild('child2'))
+        raise AssertionError('CacheChild was removed from the child types!')
+    except TypeError:
+        pass
+
+    CacheChild.clear_parent_types()
+    assert CacheChild.PARENT_TYPES == []
+    assert CacheChild.is_parent_type(CacheParent) is False
+
+
+def test_add_children():
+    top = Parent('')
+    parent1 = top.add_parent('parent1')
+    children = [Child('child{}'.format(i), data=i) for i in range(5)]
+    sub = Parent('sub')
+
+    top.add_children([sub])
+    parent1.add_children(children)
+    assert parent1.children == children
+    assert all(child.parent is parent1 for child in children)
+    assert top['parent1 > child3'].get_data() == 3
+
+    # Move existing children to a new parent
+    sub.add_children(children[:2])
+    assert parent1.children == children[2:]
+    assert sub.children == children[:2]
+    assert children[0].full_title == 'sub > child0'
+
+    try:
+        children[0].add_children([Child('bad')])
+        raise AssertionError('Child nodes cannot have children!')
+    except TypeError:
+        pass
+
+
+def test_pickle():
+    import pickle
+
+    top = Parent('')
+    parent1 = top.add_parent('parent1')
+    child1 = top.add('parent1 > child1', data=1)
+    child2 = top.add('parent1 > child2', data={'abc': 123})
+
+    loaded = pickle.loads(pickle.dumps(top))
+    assert loaded.to_dict() == top.to_dict()
+    assert isinstance(loaded['parent1'], Parent)
+    assert isinstance(loaded['parent1 > child2'], Child)
+    assert loaded['parent1 > child2'].get_data() == {'abc': 123}
+
+    loaded = pickle.loads(pickle.dumps(child1))
+    assert isinstance(loaded, Child)
+    assert loaded.parent is None
+    assert loaded.get_data() == 1
+
+
+def test_async_save_load(remove_file=True):
+    import asyncio
+
+    top = Parent('')
+    parent1 = top.add_parent('parent1')
+    subparent1 = top.add_parent('parent1 > subparent1')
+    child1 = top.add('child1', data=1)
+    child2 = top.add('parent1 > child2', data=2)
+    child3 = top.add('parent1 > subparent1 > child3', data={'abc': 123})
+
+    async def save_load(filename):
+        fname = await top.save_async(filename, chunk_size=8)
+        assert fname == filename
+        t2 = await Parent.load_async(fname, chunk_size=8)
+
+        new_node = Parent(title='new node')
+        await new_node.load_async(fname)
+        return t2, new_node
+
+    for filename in ('test_async_parent_child.json', 'test_async_parent_child.ini'):
+        try:
+            t2, new_node = asyncio.run(save_load(filename))
+            assert t2.to_dict() == top.to_dict()
+            assert new_node.title == 'new node'
+            new_node.title = ''
+            assert new_node.to_dict() == top.to_dict()
+        finally:
+            try:
+                if remove_file:
+                    os.remove(filename)
+            except (OSError, Exception):
+                pass
+
+    # Custom async format
+    saved = {}
+
+    class AsyncParent(Parent):
+        ASYNC_SAVE_EXT = {}
+        ASYNC_LOAD_EXT = {}
+
+    @AsyncParent.register_async_saver('.mem')
+    async def save_mem(node, filename, **kwargs):
+        await asyncio.sleep(0)
+        saved[filename] = node.to_dict()
+        return filename
+
+    @AsyncParent.register_async_loader('.mem')
+    async def load_mem(cls_self, filename, **kwargs):
+        await asyncio.sleep(0)
+        return cls_self.from_dict(saved[filename])
+
+    async def save_load_mem():
+        node = AsyncParent('')
+        node.add('child1', data=1)
+        await node.save_async('tree.mem')
+        return node, await AsyncParent.load_async('tree.mem')
+
+    node, loaded = asyncio.run(save_load_mem())
+    assert isinstance(loaded, AsyncParent)
+    assert loaded.to_dict() == node.to_dict()
+
+
+def test_load_many(remove_file=True):
+    filenames = []
+    for i in range(6):
+        top = Parent('')
+        top.add('shared > value', data=i, create_missing=True)
+        top.add('file{} > value'.format(i), data=i, create_missing=True)
+        if i % 2:
+            top.add('odd > file{}'.format(i), data=i, create_missing=True)
+        filename = 'test_load_many{}.{}'.format(i, 'json' if i % 3 else 'ini')
+        top.save(filename)
+        filenames.append(filename)
+
+    try:
+        tree = Parent.load_many(filenames, max_workers=3)
+        assert tree['shared > value'].get_data() == 5  # Last file wins
+        assert [ch.title for ch in tree['odd'].children] == ['file1', 'file3', 'file5']
+        for i in range(6):
+            assert tree['file{} > value'.format(i)].get_data() == i
+        assert [ch.title for ch in tree.children] == ['shared', 'file0', 'file1', 'odd', 'file2', 'file3',
+                                                      'file4', 'file5']
+
+        tree = Parent.load_many(filenames, conflict='keep', use_processes=True)
+        assert tree['shared > value'].get_data() == 0
+
+        existing = Parent('')
+        existing.add('file0 > other', data='abc', create_missing=True)
+        assert existing.load_many(filenames[:1]) is existing
+        assert [ch.title for ch in existing['file0'].children] == ['other', 'value']
+
+        try:
+            Parent.load_many(filenames, conflict='error')
+            raise AssertionError('Duplicate full titles should raise a ValueError!')
+        except ValueError:
+            pass
+    finally:
+        for filename in filenames:
+            try:
+                if remove_file:
+                    os.remove(filename)
+            except (OSError, Exception):
+                pass
+
+
+def test_flat_dict():
+    top = Parent('')
+    top.add_parent('parent1 > subparent1', create_missing=True)
+    top.add('parent1 > child1', data=1)
+    top.add('parent1 > subparent1 > child2', data=2)
+    top.add_parent('empty')
+
+    flat = top.to_flat_dict()
+    assert flat == {'parent1 > child1': 1, 'parent1 > subparent1 > child2': 2, 'empty': None}
+
+    # Parents and nodes without data use the parent type
+    assert type(Parent.from_flat_dict(flat)['empty']) is Parent
+
+    # Leaves use the first child type
+    flat['empty'] = 3
+    top2 = Parent.from_flat_dict(flat)
+    assert type(top2['parent1']) is Parent and type(top2['parent1 > subparent1']) is Parent
+    assert type(top2['parent1 > child1']) is Child and top2['parent1 > child1'].data == 1
+    assert type(top2['empty']) is Child and top2['empty'].data == 3
+    assert top2.to_flat_dict() == flat
+
+
+def test_delimiter_titles_save_load(remove_file=True):
+    top = Parent('')
+    top.add_parent(('a > b',))
+    top.add(('a > b', 'c'), data=1)
+    top.add_parent(('p', 'k > v'), create_missing=True)
+    top.add(('p', 'k > v', 'x > y'), data=2)
+    top.add(('p', 'z'), data=3)
+
+    for filename in ('test_delimiter_titles.json', 'test_delimiter_titles.ini'):
+        try:
+            t2 = Parent.load(top.save(filename))
+            assert t2.to_dict() == top.to_dict()
+            assert t2.find(('a > b', 'c')).data == 1
+            assert t2.find(('p', 'k > v', 'x > y')).data == 2
+            assert 'a' not in t2 and 'p > k' not in t2
+        finally:
+            try:
+                if remove_file:
+                    os.remove(filename)
+            except (OSError, Exception):
+                pass
+
+
+def test_cached_digests_and_snapshots():
+    # Child.set_data does not call _invalidate(), so nodes above a Child must not keep a cached digest or snapshot
+    old = Parent()
+    old.add_parent('p')
+    old.add('p > c', data=1)
+    new = old.clone()
+    assert list(old.diff(new)) == []
+    assert new.snapshot().find('p > c').data == 1
+
+    new['p > c'].data = 2
+    assert [(c.kind, c.full_title) for c in old.diff(new)] == [('data', 'p > c')]
+    assert new.snapshot().find('p > c').data == 2
+    assert old.digest() != new.digest()
+
+    # Parents without a Child below them are still cached
+    new.add_parent('q')
+    assert new['q'].snapshot() is new['q'].snapshot()
+    assert new.snapshot() is not new.snapshot()
+
+
 if __name__ == '__main__':
     test_add()
     test_json()
     test_ini()
+    test_type_registration_cache()
+    test_add_children()
+    test_pickle()
+    test_async_save_load()
+    test_load_many()
+    test_flat_dict()
+    test_delimiter_titles_save_load()
+    test_cached_digests_and_snapshots()
@@ -0,0 +1,95 @@
+import json
+
+
+def test_make_apply_patch():
+    from tnode import TNode
+
+    old = TNode()
+    parent1 = TNode('parent1', parent=old)
+    parent2 = TNode('parent2', parent=old)
+    subparent2 = TNode('subparent2', parent=parent2)
+    TNode('child6', parent=subparent2, data=6)
+    TNode('child7', parent=subparent2, data=7)
+    TNode('child1', parent=parent2, data=1)
+    TNode('child2', parent=parent1, data=2)
+    subparent1 = TNode('subparent1', parent=parent1)
+    TNode('child4', parent=subparent1, data=4)
+    TNode('child5', parent=subparent1, data=5)
+    new = old.clone()
+    replica = old.clone()
+
+    new['parent2 > child1'].set_data(10)
+    new['parent1 > subparent1'].title = 'renamed1'
+    new['parent2 > subparent2 > child6'].parent = new['parent1']
+    new['parent2 > subparent2'].remove_child(new['parent2 > subparent2 > child7'])
+    TNode('child3', parent=new['parent1 > child2'], data=3)
+    added = TNode('parent3', parent=new)
+    TNode('child8', parent=added, data={'a': 1})
+
+    patch = old.make_patch(new)
+    patch = json.loads(json.dumps(patch))  # Patches can be sent as json
+    assert {op['op'] for op in patch} == {'set_data', 'remove', 'move', 'rename', 'add'}
+
+    assert replica.apply_patch(patch) is replica
+    assert list(replica.diff(new)) == []
+    assert replica.digest() == new.digest()
+    assert replica['parent3 > child8'].get_data() == {'a': 1}
+
+    # Applying to the original tree does the same thing
+    old.apply_patch(patch)
+    assert old.to_dict() == new.to_dict()
+
+
+def test_patch_rollback():
+    from tnode import ParentNode, ChildNode
+
+    class Parent(ParentNode):
+        PARENT_TYPES = []
+        CHILD_TYPES = []
+
+    class Child(ChildNode):
+        PARENT_TYPES = []
+        CHILD_TYPES = []
+
+    Parent.register_child_type(Child)  # Register the child type first!
+    Parent.register_parent_type(Parent)
+    Parent.register_child_type(Parent)
+    Child.register_parent_type(Parent)
+
+    top = Parent('')
+    top.add_parent('parent1')
+    top.add_parent('parent2')
+    top.add('parent1 > child1', data=1)
+    top.add('parent1 > child2', data=2)
+    expected = top.to_dict()
+    digest = top.digest()
+
+    patch = [
+        {'op': 'set_data', 'path': 'parent1 > child1', 'data': 100},
+        {'op': 'remove', 'path': 'parent1 > child2'},
+        {'op': 'rename', 'path': 'parent2', 'title': 'parent3'},
+        {'op': 'add', 'path': 'parent3 > child3', 'node': {'title': 'child3', 'data': 3}},
+        {'op': 'move', 'path': 'parent1', 'to': 'parent1 > child1'},  # Child nodes cannot have children
+        ]
+    try:
+        top.apply_patch(patch)
+        raise AssertionError('The invalid move should raise a TypeError!')
+    except TypeError:
+        pass
+
+    assert top.to_dict() == expected
+    assert top.digest() == digest
+    assert top['parent1 > child1'].get_data() == 1
+    assert [ch.title for ch in top['parent1'].children] == ['child1', 'child2']
+
+    # The valid part of the patch still works
+    top.apply_patch(patch[:-1])
+    assert top['parent1 > child1'].get_data() == 100
+    assert 'parent1 > child2' not in top
+    assert isinstance(top['parent3 > child3'], Child)
+    assert top['parent3 > child3'].get_data() == 3
+
+
+if __name__ == '__main__':
+    test_make_apply_patch()
+    test_patch_rollback()
@@ -0,0 +1,215 @@
+def test_tpath():
+    import pickle
+    from tnode import TPath
+
+    path = TPath.parse('a > b > c')
+    assert path.parts == ('a', 'b', 'c')
+    assert TPath(['a', 'b', 'c']) is path
+    assert TPath(path) is path
+    assert TPath.parse('a > b > c') is path
+    assert TPath.parse('a/b/c', '/') is path
+    assert hash(path) == hash(('a', 'b', 'c'))
+    assert path == ('a', 'b', 'c')
+    assert path != TPath(['a', 'b'])
+    assert {path: 1}[TPath(('a', 'b', 'c'))] == 1
+
+    assert path.title == 'c'
+    assert path.parent is TPath(('a', 'b'))
+    assert path.parent.child('c') is path
+    assert path[0] == 'a'
+    assert path[1:] is TPath(('b', 'c'))
+    assert len(path) == 3
+    assert list(path) == ['a', 'b', 'c']
+    assert path.to_str() == str(path) == 'a > b > c'
+    assert path.to_str('/') == 'a/b/c'
+    assert pickle.loads(pickle.dumps(path)) is path
+
+    try:
+        path.parts = ()
+        raise AssertionError('TPath should not be modifiable!')
+    except AttributeError:
+        pass
+
+
+def test_tuple_paths():
+    from tnode import TNode, TPath, ParentNode, ChildNode
+
+    t = TNode()
+    parent1 = TNode('parent1', parent=t)
+    child1 = TNode('child1', parent=parent1)
+
+    path = TPath.parse('parent1 > child1')
+    assert t.find(path) is child1
+    assert t.find(('parent1', 'child1')) is child1
+    assert t[['parent1', 'child1']] is child1
+    assert t.get(('parent1', 'missing')) is None
+    assert path in t
+    assert ('parent2', 'child1') not in t
+    assert t.find_parent(path) == (parent1, 'child1')
+
+    child2 = TNode('x')
+    t[('parent2', 'child2')] = child2
+    assert child2.full_title == 'parent2 > child2'
+    assert t.snapshot().get(('parent2', 'child2')).title == 'child2'
+
+    # Titled root is skipped like a full_title string
+    root = TNode('root')
+    a = TNode('a', parent=root)
+    assert root.find(('root', 'a')) is a
+    assert root.find(('a',)) is a
+
+    # ParentNode.add and add_parent
+    class Parent(ParentNode):
+        PARENT_TYPES = []
+        CHILD_TYPES = []
+
+    class Child(ChildNode):
+        PARENT_TYPES = []
+        CHILD_TYPES = []
+
+    Parent.register_child_type(Child)
+    Parent.register_child_type(Parent)
+    Child.register_parent_type(Parent)
+
+    p = Parent()
+    p.add_parent(('a',))
+    c = p.add(TPath(('a', 'b')), data=1)
+    assert c.full_title == 'a > b'
+    assert p.add(('a', 'b')) is c
+
+
+def test_escaped_titles():
+    from tnode import TNode, TPath, escape_title, join_titles, split_path
+
+    assert escape_title('a > b') == 'a\\ > b'
+    assert escape_title('C:\\dir') == 'C:\\dir'
+    assert escape_title('end\\') == 'end\\\\'
+    for titles in (['a > b', 'c'], ['C:\\dir', 'x'], ['end\\', 'y'], ['\\ > ', ' > ', '']):
+        assert split_path(join_titles(titles)) == titles
+        assert TPath.parse(TPath(titles).to_str()) is TPath(titles)
+
+    t = TNode()
+    parent = TNode('a > b', parent=t)
+    child = TNode('c', parent=parent)
+    path = TNode('C:\\dir', parent=child)
+    assert child.full_title == 'a\\ > b > c'
+    assert t.find(child.full_title) is child
+    assert t.find(path.full_title) is path
+    assert t.find(('a > b', 'c')) is child
+    assert t.find(child) is child
+    assert t.snapshot().get(child.full_title).title == 'c'
+    assert dict(t.iter_items(leaves_only=False)) == {'a\\ > b': None, 'a\\ > b > c': None,
+                                                     'a\\ > b > c > C:\\dir': None}
+    assert [full_title for full_title, _ in t.iter_dict()] == ['', 'a\\ > b', 'a\\ > b > c',
+                                                              'a\\ > b > c > C:\\dir']
+    assert t.to_dict(include=['a\\ > b > c']) == t.to_dict()
+
+    flat = TNode.from_flat_dict(t.to_flat_dict())
+    assert flat.find(path.full_title).full_title == path.full_title
+
+
+def test_tree_delimiter():
+    from tnode import TNode
+
+    t = TNode()
+    parent = TNode('a', parent=t)
+    child = TNode('b/c', parent=parent)
+    assert child.full_title == 'a > b/c'
+
+    child.set_delimiter('/')
+    assert t.get_delimiter() == child.get_delimiter() == '/'
+    assert TNode.get_delimiter() == ' > '
+    assert TNode().get_delimiter() == ' > '
+    assert child.full_title == 'a/b\\/c'
+    assert t.find('a/b\\/c') is child
+    assert t.snapshot().get('a/b\\/c').title == 'b/c'
+
+    # A subtree uses the delimiter of the tree it is added to
+    other = TNode()
+    other.add_child(parent)
+    assert child.get_delimiter() == ' > '
+    assert child.full_title == 'a > b/c'
+
+
+def test_delimiter_titles_are_not_split():
+    from tnode import TNode, ParentNode, ChildNode
+
+    class Parent(ParentNode):
+        PARENT_TYPES = []
+        CHILD_TYPES = []
+
+    class Child(ChildNode):
+        PARENT_TYPES = []
+        CHILD_TYPES = []
+
+    Parent.register_child_type(Child)
+    Parent.register_child_type(Parent)
+    Child.register_parent_type(Parent)
+
+    # add and add_parent find the existing child by its title
+    top = Parent()
+    a = top.add_parent(('a',))
+    c = top.add(('a', 'x > y'), data=1)
+    assert top.add(('a', 'x > y'), data=2) is c
+    assert len(a) == 1 and c.data == 2
+    p = top.add_parent(('a', 'w > v'))
+    assert top.add_parent(('a', 'w > v')) is p
+    assert len(a) == 2
+
+    # Renaming only checks the direct children
+    t = TNode()
+    node = TNode('node', parent=t)
+    TNode('b', parent=TNode('a', parent=node))
+    node.title = 'a > b'
+    assert node.title == 'a > b'
+    sibling = TNode('sibling', parent=t)
+    try:
+        sibling.title = 'a > b'
+        raise AssertionError('Duplicate titles should raise a ValueError!')
+    except ValueError:
+        pass
+
+    # Patch add op
+    old = TNode()
+    TNode('y', parent=TNode('x', parent=TNode('p', parent=old)))
+    new = old.clone()
+    TNode('x > y', parent=new['p'], data=1)
+    old.apply_patch(old.make_patch(new))
+    assert old.find(('p', 'x > y')).data == 1
+    assert old.find(('p', 'x', 'y')).data is None
+    try:
+        old.apply_patch([{'op': 'add', 'path': 'p > x\\ > y', 'node': {'title': 'x > y'}}])
+        raise AssertionError('Adding a duplicate title should raise a ValueError!')
+    except ValueError:
+        pass
+
+
+def test_escaped_title_round_trip():
+    import itertools
+    from tnode import TNode, escape_title, join_titles, split_path
+
+    assert escape_title('a >') == 'a\\ >'
+    titles = ['']
+    for size in range(1, 4):
+        titles.extend(''.join(chars) for chars in itertools.product(('a', '\\', '>', ' ', ' > '), repeat=size))
+    for first, second in itertools.product(titles, repeat=2):
+        assert split_path(join_titles([first, second])) == [first, second], (first, second)
+    for first, second in itertools.product(titles, repeat=2):
+        assert split_path(join_titles([first, second], '::'), '::') == [first, second], (first, second)
+
+    for title in ('a >', 'q\\ >', '>', ' > >'):
+        t = TNode()
+        child = TNode('x', parent=TNode(title, parent=t))
+        assert split_path(child.full_title) == [title, 'x']
+        assert t.find(child.full_title) is child
+        assert t.get(child.full_title) is child
+        assert child.full_title in t
+
+
+if __name__ == '__main__':
+    test_tpath()
+    test_tuple_paths()
+    test_escaped_titles()
+    test_tree_delimiter()
+    test_delimiter_titles_are_not_split()
+    test_escaped_title_round_trip()
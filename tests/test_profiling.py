@@ -0,0 +1,66 @@
+def test_profile():
+    from tnode import TNode
+    from tnode import profiling
+
+    t = TNode()
+    parent1 = TNode('parent1', parent=t)
+    TNode('child1', parent=parent1)
+
+    assert not profiling.is_enabled()
+    with TNode.profile() as prof:
+        assert profiling.is_enabled()
+        t.find('parent1 > child1')
+        parent1.full_title
+        TNode('child2', parent=parent1)
+        t.add_children([TNode('a'), TNode('b')])
+    assert not profiling.is_enabled()
+
+    stats = prof.stats
+    assert stats['lookup']['count'] == 1
+    assert stats['path_segment']['count'] == 2
+    assert stats['full_title']['count'] >= 1
+    assert stats['add_child']['count'] == 3
+    assert stats['validate_child']['count'] == 2
+    assert stats['validate_parent']['count'] == 2
+    assert all(value['time'] >= 0 for value in stats.values())
+
+    # add_child sets the parent, which calls add_child again. The child is only counted once.
+    with TNode.profile() as prof:
+        t.add_child(TNode('c'))
+    assert prof.stats['add_child']['count'] == 1
+    assert prof.stats['validate_child']['count'] == 1
+    assert prof.stats['validate_parent']['count'] == 1
+
+    # Nothing is recorded while disabled
+    before = profiling.stats()
+    t.find('parent1 > child1')
+    assert profiling.stats() == before
+
+    # Failed lookups are counted
+    with TNode.profile() as prof:
+        try:
+            t.find('missing > child1')
+        except KeyError:
+            pass
+    assert prof.stats['lookup']['count'] == 1
+
+
+def test_enable_disable():
+    from tnode import TNode
+    from tnode import profiling
+
+    t = TNode('root')
+    profiling.reset()
+    profiling.enable()
+    try:
+        TNode('child', parent=t).full_title
+    finally:
+        profiling.disable()
+    assert profiling.stats()['full_title']['count'] == 1
+    profiling.reset()
+    assert profiling.stats() == {}
+
+
+if __name__ == '__main__':
+    test_profile()
+    test_enable_disable()
@@ -0,0 +1,132 @@
+import os
+import threading
+
+
+def test_snapshot():
+    from tnode import TNode, TSnapshot
+
+    t = TNode()
+    parent1 = TNode('parent1', parent=t)
+    parent2 = TNode('parent2', parent=t)
+    subparent2 = TNode('subparent2', parent=parent2)
+    TNode('child6', parent=subparent2, data=6)
+    TNode('child7', parent=subparent2, data=7)
+    TNode('child1', parent=parent2, data=1)
+    TNode('child2', parent=parent1, data=2)
+    subparent1 = TNode('subparent1', parent=parent1)
+    TNode('child4', parent=subparent1, data=4)
+
+    snap = t.snapshot()
+    assert isinstance(snap, TSnapshot)
+    assert snap.to_dict() == t.to_dict()
+    assert [s.title for s in snap.iter()] == [n.title for n in t.iter()]
+    assert [s.title for s in snap.iter_nearest()] == [n.title for n in t.iter_nearest()]
+    assert snap['parent2 > subparent2 > child6'].get_data() == 6
+    assert 'parent1 > subparent1' in snap
+    assert 'parent1 > missing' not in snap
+    assert t.snapshot() is snap  # Cached
+
+    try:
+        snap.title = 'new'
+        raise AssertionError('Snapshots must be immutable!')
+    except AttributeError:
+        pass
+
+    # Only the changed path is rebuilt
+    t['parent2 > subparent2 > child6'].set_data(60)
+    snap2 = t.snapshot()
+    assert snap2 is not snap
+    assert snap2['parent2'] is not snap['parent2']
+    assert snap2['parent2 > subparent2'] is not snap['parent2 > subparent2']
+    assert snap2['parent2 > child1'] is snap['parent2 > child1']
+    assert snap2['parent1'] is snap['parent1']
+    assert snap['parent2 > subparent2 > child6'].get_data() == 6
+    assert snap2['parent2 > subparent2 > child6'].get_data() == 60
+
+    # Structural changes and titles
+    child4 = t['parent1 > subparent1 > child4']
+    child4.parent = t['parent2']
+    child4.title = 'child5'
+    snap3 = t.snapshot()
+    assert snap3.to_dict() == t.to_dict()
+    assert 'parent1 > subparent1 > child4' in snap2
+    assert 'parent2 > child5' in snap3
+    assert snap3['parent2 > subparent2'] is snap2['parent2 > subparent2']
+
+    # Subtree snapshots are shared with the full snapshot
+    assert t['parent1'].snapshot() is snap3['parent1']
+
+    t2 = snap3.to_tree()
+    assert t2.to_dict() == t.to_dict()
+
+
+def test_snapshot_background_export(remove_file=True):
+    from tnode import TNode
+
+    t = TNode()
+    parent1 = TNode('parent1', parent=t)
+    parent2 = TNode('parent2', parent=t)
+    subparent2 = TNode('subparent2', parent=parent2)
+    TNode('child6', parent=subparent2, data=6)
+    TNode('child7', parent=subparent2, data=7)
+    TNode('child1', parent=parent2, data=1)
+    TNode('child2', parent=parent1, data=2)
+    subparent1 = TNode('subparent1', parent=parent1)
+    TNode('child4', parent=subparent1, data=4)
+
+    snap = t.snapshot()
+    expected = snap.to_dict()
+
+    filename = 'test_snapshot_export.json'
+    results = []
+
+    def export():
+        results.append(TNode.from_json(snap.to_json(filename)).to_dict())
+
+    th = threading.Thread(target=export)
+    th.start()
+    for i in range(100):
+        TNode('new{}'.format(i), parent=t, data=i)
+    th.join()
+    try:
+        assert results == [expected]
+        assert len(t) == 102
+    finally:
+        try:
+            if remove_file:
+                os.remove(filename)
+        except (OSError, Exception):
+            pass
+
+
+def test_change_while_building():
+    from tnode import TNode
+
+    class Racy(TNode):
+        CACHE_DERIVED = True
+        change = None
+
+        def get_data(self):
+            # Simulate another thread setting the data after it was read, but before the cache is stored
+            data = super().get_data()
+            if self.change is not None:
+                change, self.change = self.change, None
+                self.set_data(change)
+            return data
+
+    t = TNode()
+    x = Racy('x', parent=TNode('p', parent=t), data=1)
+
+    x.change = 2
+    assert t.snapshot()['p > x'].data == 1
+    assert t.snapshot()['p > x'].data == 2
+
+    x.change = 3
+    t.content_digest()
+    assert t.content_digest() == t.clone().content_digest()
+
+
+if __name__ == '__main__':
+    test_snapshot()
+    test_snapshot_background_export()
+    test_change_while_building()
@@ -133,6 +133,135 @@ def test_clear():
     assert parent2.parent is None
 
 
+def test_remove_children():
+    import gc
+    import weakref
+    from tnode import TNode
+
+    t = TNode()
+    children = [TNode('child{}'.format(i), parent=t) for i in range(10)]
+
+    removed = t.remove_children(children[2:8:2])
+    assert removed == [children[2], children[4], children[6]]
+    assert t.children == [c for i, c in enumerate(children) if i not in (2, 4, 6)]
+    assert all(c.parent is None for c in removed)
+
+    # Nothing is removed if a child is missing
+    try:
+        t.remove_children([children[0], children[2]])
+        raise AssertionError('Missing child should raise a ValueError!')
+    except ValueError:
+        pass
+    assert len(t) == 7 and children[0].parent is t
+
+    # Destroy breaks the parent/child cycles, so the removed subtree is freed without the garbage collector
+    sub = TNode('sub', parent=t)
+    leaf = TNode('leaf', parent=TNode('subparent', parent=sub))
+    ref = weakref.ref(leaf)
+    gc.disable()
+    try:
+        t.clear(destroy=True)
+        del sub, leaf
+        assert ref() is None
+    finally:
+        gc.enable()
+    assert len(t) == 0
+    assert all(c.parent is None for c in children)
+
+    node = TNode('node', parent=t)
+    child = TNode('child', parent=node)
+    node.destroy()
+    assert len(t) == 0 and node.parent is None and len(node) == 0 and child.parent is None
+
+
+def test_move():
+    from tnode import TNode
+
+    t = TNode()
+    parent1 = TNode('parent1', parent=t)
+    parent2 = TNode('parent2', parent=t)
+    children = [TNode('child{}'.format(i), parent=parent1, data=i) for i in range(5)]
+    sub = TNode('sub', parent=children[0])
+
+    digest = children[0].content_digest()
+    assert t.move(children[0], parent2) == [children[0]]
+    assert children[0].parent is parent2 and parent2.children == [children[0]]
+    assert children[0] not in parent1.children
+    assert t.find('parent2 > child0 > sub') is sub
+    assert children[0].content_digest() == digest  # Nothing below the node changed
+
+    # Move several nodes by full title to a position
+    moved = t.move(['parent1 > child2', children[4], ('parent1', 'child3')], 'parent2', index=0)
+    assert moved == [children[2], children[4], children[3]]
+    assert parent2.children == [children[2], children[4], children[3], children[0]]
+    assert parent1.children == [children[1]]
+
+    # Move to the top level node
+    t.move('parent2 > child4', '')
+    assert children[4].parent is t and t.children[-1] is children[4]
+
+    # Cannot move a node below itself
+    try:
+        t.move(parent2, 'parent2 > child0 > sub')
+        raise AssertionError('Moving a node below itself should raise a ValueError!')
+    except ValueError:
+        pass
+    assert parent2.parent is t
+
+
+def test_insert_child_and_sorted_children():
+    from tnode import TNode
+
+    t = TNode()
+    a = TNode('a', parent=t)
+    c = TNode('c', parent=t)
+    b = t.insert_child(1, TNode('b'))
+    assert t.children == [a, b, c]
+    t.insert_child(0, c)  # Existing children are moved
+    assert t.children == [c, a, b] and c.parent is t
+
+    other = TNode('other')
+    x = TNode('x', parent=other)
+    t.insert_child(1, x)
+    assert t.children == [c, x, a, b] and x.parent is t and len(other) == 0
+
+    # Sorted by title
+    t.set_sort_key('title')
+    assert [ch.title for ch in t.children] == ['a', 'b', 'c', 'x']
+    TNode('d', parent=t)
+    t.insert_child(0, TNode('aa'))  # Index is ignored
+    t.add_children([TNode('z'), TNode('bb')])
+    assert [ch.title for ch in t.children] == ['a', 'aa', 'b', 'bb', 'c', 'd', 'x', 'z']
+    x.title = 'ab'
+    assert [ch.title for ch in t.children] == ['a', 'aa', 'ab', 'b', 'bb', 'c', 'd', 'z']
+
+    assert t['bb'].title == 'bb'
+    assert t.get('missing') is None
+    assert 'ab' in t and 'x' not in t
+    assert t.child_index(t['d']) == 6
+    assert [ch.title for ch in t.child_range('ab', 'c')] == ['ab', 'b', 'bb']
+    assert [ch.title for ch in t.child_range('d')] == ['d', 'z']
+    assert [ch.title for ch in t.child_range(stop='aa')] == ['a']
+
+    # Sorted by a key function
+    t.set_sort_key(lambda ch: -len(ch.title))
+    assert [len(ch.title) for ch in t.children] == [2, 2, 2, 1, 1, 1, 1, 1]
+    t.set_sort_key(None)
+    TNode('0', parent=t)
+    assert t.children[-1].title == '0'
+
+    # Sorted class
+    class SortedNode(TNode):
+        SORT_KEY = 'title'
+
+    s = SortedNode()
+    for title in 'dbca':
+        SortedNode(title, parent=s)
+    assert [ch.title for ch in s.children] == ['a', 'b', 'c', 'd']
+    SortedNode('sub', parent=s['b'])
+    assert s.find('b > sub').title == 'sub'
+
+
 def test_find_parent():
     from tnode import TNode
 
@@ -469,6 +598,144 @@ def test_to_dict_from_dict():
     for v1, v2 in zip(t.iter(), t2.iter()):
         assert v1.full_title == v2.full_title
 
+    # Validators that depend on the instance and set_parent overrides are called for every child
+    class Limited(TNode):
+        added = []
+
+        def validate_parent(self, parent):
+            if parent is not None and len(parent) >= 2:
+                raise ValueError('Only 2 children are allowed!')
+
+        def set_parent(self, parent):
+            self.added.append(self.title)
+            super().set_parent(parent)
+
+    try:
+        Limited.from_dict({'title': '', 'children': [{'title': 'a'}, {'title': 'b'}, {'title': 'c'}]})
+        raise AssertionError('validate_parent should be called for every child!')
+    except ValueError:
+        pass
+    assert Limited.added == ['a', 'b', 'c']
+
+
+def test_to_dict_options():
+    from tnode import TNode
+
+    t = TNode()
+    parent1 = TNode('parent1', parent=t)
+    TNode('child1', parent=parent1, data=1, description='first')
+    TNode('child2', parent=parent1, data=2)
+    sub = TNode('sub', parent=parent1)
+    TNode('child3', parent=sub, data=3)
+    parent2 = TNode('parent2', parent=t)
+    TNode('child4', parent=parent2, data=4)
+
+    # Excluded nodes are left out and their children are not visited
+    visited = []
+    d = t.to_dict(exclude=lambda full_title, node: visited.append(full_title) or full_title == 'parent1 > sub')
+    assert 'parent1 > sub > child3' not in visited
+    assert [c['title'] for c in d['children'][0]['children']] == ['child1', 'child2']
+    assert t.to_dict(exclude={'parent2', 'parent1 > child1'}) == {
+        'title': '', 'children': [
+            {'title': 'parent1', 'children': [
+                {'title': 'child2', 'data': 2},
+                {'title': 'sub', 'children': [{'title': 'child3', 'data': 3}]},
+                ]},
+            ]}
+    d = t.to_dict(exclude=['parent1 > child*'])
+    assert [c['title'] for c in d['children'][0]['children']] == ['sub']
+
+    # Include the matching nodes, their parents and everything below them
+    assert t.to_dict(include=['parent1 > sub', ('parent2', 'child4')]) == {
+        'title': '', 'children': [
+            {'title': 'parent1', 'children': [
+                {'title': 'sub', 'children': [{'title': 'child3', 'data': 3}]},
+                ]},
+            {'title': 'parent2', 'children': [{'title': 'child4', 'data': 4}]},
+            ]}
+    d = t.to_dict(include=lambda full_title, node: node.get_data() == 3)
+    assert d['children'][0]['children'][0]['children'] == [{'title': 'child3', 'data': 3}]
+    assert t.to_dict(include=['missing']) == {}
+
+    # Depth and fields
+    assert t.to_dict(max_depth=1) == {
+        'title': '', 'children': [{'title': 'parent1', 'children': []}, {'title': 'parent2', 'children': []}]}
+    assert parent1.to_dict(max_depth=0) == {'title': 'parent1', 'children': []}
+    d = parent1.to_dict(fields=['title', 'description'], max_depth=1)
+    assert d['children'] == [{'title': 'child1', 'description': 'first'}, {'title': 'child2'},
+                             {'title': 'sub', 'children': []}]
+
+    # Full titles of a subtree export include the parent titles
+    assert sub.to_dict(exclude=['parent1 > sub > child3']) == {'title': 'sub', 'children': []}
+
+
+def test_deep_to_dict_and_iter_dict():
+    import sys
+    from tnode import TNode
+
+    t = TNode()
+    parent1 = TNode('parent1', parent=t)
+    TNode('sub', parent=parent1)
+    TNode('child1', parent=parent1, data=1)
+    TNode('child2', parent=t, data=2)
+
+    assert list(t.iter_dict()) == [
+        ('', {'title': ''}),
+        ('child2', {'title': 'child2', 'data': 2}),
+        ('parent1', {'title': 'parent1'}),
+        ('parent1 > child1', {'title': 'child1', 'data': 1}),
+        ('parent1 > sub', {'title': 'sub'}),
+        ]
+    assert [ft for ft, _ in t.iter_dict(include=['parent1 > sub'])] == ['', 'parent1', 'parent1 > sub']
+    assert [ft for ft, _ in t.iter_dict(exclude=['parent1'], max_depth=1)] == ['', 'child2']
+    assert list(t.iter_dict(include=['missing'])) == []
+    assert [ft for ft, _ in t.snapshot().iter_dict()] == [ft for ft, _ in t.iter_dict()]
+
+    # Deeper than the recursion limit
+    depth = sys.getrecursionlimit() + 100
+    deep = node = TNode('deep')
+    for i in range(depth):
+        node = TNode('node{}'.format(i), parent=node)
+    node.set_data(1)
+
+    d = deep.to_dict()
+    count = 0
+    while 'children' in d:
+        d = d['children'][0]
+        count += 1
+    assert count == depth and d == {'title': 'node{}'.format(depth - 1), 'data': 1}
+    assert sum(1 for _ in deep.iter_dict()) == depth + 1
+    assert list(deep.snapshot().iter_dict()) == list(deep.iter_dict())
+    deep.snapshot().to_dict()
+
+
+def test_flat_dict():
+    from tnode import TNode
+
+    t = TNode()
+    parent1 = TNode('parent1', parent=t)
+    TNode('child1', parent=parent1, data=1)
+    sub = TNode('sub', parent=parent1)
+    TNode('child2', parent=sub, data=2)
+    TNode('empty', parent=t)
+
+    assert list(t.iter_items()) == [('parent1 > child1', 1), ('parent1 > sub > child2', 2), ('empty', None)]
+    assert [ft for ft, _ in t.iter_items(leaves_only=False)] == [n.full_title for n in t.iter()]
+    assert list(sub.iter_items(sep='/')) == [('parent1/sub/child2', 2)]
+
+    flat = t.to_flat_dict()
+    assert flat == {'parent1 > child1': 1, 'parent1 > sub > child2': 2, 'empty': None}
+    t2 = TNode.from_flat_dict(flat)
+    assert t2.to_dict() == t.to_dict()
+    assert TNode.from_flat_dict(t.to_flat_dict(sep='.'), sep='.').to_dict() == t.to_dict()
+
+    # Add to an existing tree
+    TNode.from_flat_dict({'parent1 > child1': 10, 'parent1 > sub > child3': 3, ('new', 'child4'): 4}, tree=t2)
+    assert t2['parent1 > child1'].data == 10
+    assert len(t2['parent1']) == 2
+    assert [ch.title for ch in t2['parent1 > sub'].children] == ['child2', 'child3']
+    assert t2['new > child4'].data == 4
+
 
 def test_json_support(remove_file=True):
     from tnode import TNode
@@ -532,16 +799,191 @@ def test_json_support(remove_file=True):
         except (OSError, Exception):
             pass
 
+
+def test_lazy_formats():
+    import sys
+    import subprocess
+
+    # Importing tnode does not import the modules that are only needed to save and load files
+    code = ('import sys, tnode; '
+            'print(sorted(m for m in ("json", "configparser", "traceback", "pathlib", "dataclasses", "hashlib") '
+            'if m in sys.modules))')
+    out = subprocess.check_output([sys.executable, '-c', code], cwd=os.path.dirname(os.path.dirname(__file__)))
+    assert out.decode().strip() == '[]'
+
+    from tnode import TNode, ParentNode
+
+    class Node(TNode):
+        SAVE_EXT = {}
+        LOAD_EXT = {}
+
+    def save_text(node, filename, **kwargs):
+        return 'custom'
+
+    Node.register_saver('.json', save_text)
+    Node.register_formats()
+    assert Node.SAVE_EXT['.json'] is save_text  # Registered extensions are not replaced
+    assert Node.LOAD_EXT['.json'] is TNode.from_json.__func__
+    assert Node().save('test.json') == 'custom'
+
+    ParentNode.register_formats()
+    assert set(ParentNode.FORMATS) <= set(ParentNode.SAVE_EXT)
+    assert set(ParentNode.FORMATS) <= set(ParentNode.LOAD_EXT)
+
+    # Threads that save at the same time all see the registered formats
+    import io
+    import threading
+
+    class Threaded(ParentNode):
+        SAVE_EXT = {}
+        LOAD_EXT = {}
+
+    errors = []
+
+    def save():
+        try:
+            Threaded().save(io.StringIO(), ext='.ini')
+        except Exception as err:
+            errors.append(err)
+
+    threads = [threading.Thread(target=save) for _ in range(8)]
+    for th in threads:
+        th.start()
+    for th in threads:
+        th.join()
+    assert errors == []
+
+
+def test_clone():
+    from tnode import TNode
+
+    t = TNode()
+    parent1 = TNode('parent1', parent=t)
+    child1 = TNode('child1', parent=parent1, data={'a': [1, 2]})
+    subparent1 = TNode('subparent1', parent=parent1, color='red')
+    child2 = TNode('child2', parent=subparent1, data=2)
+
+    copied = parent1.clone()
+    assert copied is not parent1
+    assert copied.parent is None
+    assert parent1.parent is t
+    assert copied.full_title == 'parent1'
+    assert copied.to_dict() == parent1.to_dict()
+    assert copied['subparent1'].color == 'red'
+    assert copied['subparent1 > child2'].parent is copied['subparent1']
+    assert copied['child1'].get_data() == {'a': [1, 2]}
+    assert copied['child1'].get_data() is not child1.get_data()
+    for v1, v2 in zip(parent1.iter(), copied.iter()):
+        assert v1 is not v2
+
+    shared = parent1.clone(share_data=True)
+    assert shared['child1'].get_data() is child1.get_data()
+
+    shallow = parent1.clone(deep=False)
+    assert len(shallow) == 0
+    assert shallow.title == 'parent1'
+
+    # Changing the clone does not change the original
+    copied['subparent1'].title = 'other'
+    copied.add_child(TNode('child3'))
+    assert 'subparent1' in parent1
+    assert 'child3' not in parent1
+
+
+def test_pickle():
+    import pickle
+    from tnode import TNode
+
+    t = TNode()
+    parent1 = TNode('parent1', parent=t)
+    child1 = TNode('child1', parent=parent1, data=[1, 2])
+    subparent1 = TNode('subparent1', parent=parent1, color='red')
+    child2 = TNode('child2', parent=subparent1, data=2)
+
+    # The parent link is cut at the pickled node
+    loaded = pickle.loads(pickle.dumps(parent1))
+    assert loaded.parent is None
+    assert loaded.to_dict() == parent1.to_dict()
+    assert loaded['subparent1'].color == 'red'
+    assert loaded['subparent1 > child2'].parent is loaded['subparent1']
+
+    # A leaf does not pickle the whole tree
+    assert len(pickle.dumps(child2)) < len(pickle.dumps(t))
+
+    # Keep the tree above the pickled node
+    TNode.PICKLE_PARENT = True
+    try:
+        loaded = pickle.loads(pickle.dumps(child2))
+    finally:
+        TNode.PICKLE_PARENT = False
+    assert loaded.full_title == 'parent1 > subparent1 > child2'
+    assert loaded.get_root().to_dict() == t.to_dict()
+
+    # Deep trees do not hit the recursion limit
+    deep = node = TNode('deep')
+    for i in range(5000):
+        node = TNode('node{}'.format(i), parent=node)
+    loaded = pickle.loads(pickle.dumps(deep))
+    count = 0
+    while len(loaded) > 0:
+        loaded = loaded[0]
+        count += 1
+    assert count == 5000
+    assert loaded.title == 'node4999'
+
+
+def test_get():
+    from tnode import TNode
+
+    t = TNode()
+    parent1 = TNode('parent1', parent=t)
+    child1 = TNode('child1', parent=parent1)
+
+    assert t.get('parent1 > child1') is child1
+    assert t.get(parent1) is parent1
+    assert t.get(child1) is child1
+    assert t.get(0) is parent1
+    assert t.get(-1) is parent1
+
+    # Missing nodes return the default
+    assert t.get('parent1 > child2') is None
+    assert t.get('parent2 > child1', 'default') == 'default'
+    assert t.get(1) is None
+    assert t.get(TNode('other')) is None
+
+    assert 'parent1 > child1' in t
+    assert 'parent2 > child1' not in t
+    assert None not in t
+    assert t.exists(child1)
+    assert not t.exists('missing')
+
+    try:
+        t['parent2 > child1']
+        raise AssertionError('Missing node should raise a KeyError!')
+    except KeyError:
+        pass
+
+
 if __name__ == '__main__':
     test_init_and_properties()
     test_get_parents()
     test_add_child()
     test_remove_child()
     test_clear()
+    test_remove_children()
+    test_move()
+    test_insert_child_and_sorted_children()
     test_find_parent()
     test_find()
     test_iter()
     test_eq_contains_getitem_setitem()
     test_str()
     test_to_dict_from_dict()
+    test_to_dict_options()
+    test_deep_to_dict_and_iter_dict()
+    test_flat_dict()
     test_json_support()
+    test_lazy_formats()
+    test_clone()
+    test_pickle()
+    test_get()
@@ -2,3 +2,9 @@ from .__meta__ import version as __version__
 
 from .interface import TNode, is_file_path, open_file
 from .parent_child import ParentNode, ChildNode
+from .lazy import LazyNode
+from .locking import RWLock
+from .snapshot import TSnapshot
+from .paths import TPath, escape_title, join_titles, split_path
+from .diff import Change
+from .observers import TEvent
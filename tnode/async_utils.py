@@ -0,0 +1,57 @@
+import io
+import asyncio
+import functools
+
+from .file_utils import FileWrapper
+
+
+__all__ = ['DEFAULT_CHUNK_SIZE', 'run_in_executor', 'write_chunks', 'read_chunks', 'encode', 'decode']
+
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+
+async def run_in_executor(executor, func, *args, **kwargs):
+    """Run the function in the executor (the loop's default executor if None) and return the result."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, functools.partial(func, *args, **kwargs))
+
+
+async def write_chunks(filename, text, executor=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Write the text to a filename or file object one chunk at a time yielding to the event loop between chunks."""
+    file = FileWrapper(filename, 'w')
+    await run_in_executor(executor, file.__enter__)
+    try:
+        for i in range(0, len(text), chunk_size):
+            await run_in_executor(executor, file.write, text[i: i+chunk_size])
+    finally:
+        await run_in_executor(executor, file.__exit__, None, None, None)
+    return filename
+
+
+async def read_chunks(filename, executor=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Read the text from a filename or file object one chunk at a time yielding to the event loop between chunks."""
+    chunks = []
+    file = FileWrapper(filename, 'r')
+    await run_in_executor(executor, file.__enter__)
+    try:
+        while True:
+            chunk = await run_in_executor(executor, file.read, chunk_size)
+            if not chunk:
+                break
+            chunks.append(chunk)
+    finally:
+        await run_in_executor(executor, file.__exit__, None, None, None)
+    return ''.join(chunks)
+
+
+def encode(save_func, node, **kwargs):
+    """Run a registered save function into a string buffer and return the text."""
+    buffer = io.StringIO()
+    save_func(node, buffer, **kwargs)
+    return buffer.getvalue()
+
+
+def decode(bound_load_func, text, **kwargs):
+    """Run a bound registered load function on the given text."""
+    return bound_load_func(io.StringIO(text), **kwargs)
@@ -0,0 +1,149 @@
+from collections import namedtuple
+
+
+__all__ = ['Change', 'ADDED', 'REMOVED', 'MOVED', 'DATA', 'RENAMED', 'hash_title', 'hash_node', 'content_digests',
+           'diff_trees']
+
+
+ADDED = 'added'
+REMOVED = 'removed'
+MOVED = 'moved'
+DATA = 'data'
+RENAMED = 'renamed'
+
+
+Change = namedtuple('Change', ['kind', 'full_title', 'old', 'new'])
+Change.__doc__ = """Change between two trees.
+
+Args:
+    kind (str): 'added', 'removed', 'moved', 'data' or 'renamed'.
+    full_title (str): Full title of the node in the new tree (or the old tree if it was removed).
+    old (TNode): Node in the old tree or None if it was added.
+    new (TNode): Node in the new tree or None if it was removed.
+"""
+
+
+def iter_nodes(node):
+    """Return the children of a node that are nodes."""
+    return [ch for ch in getattr(node, 'children', []) if hasattr(ch, 'has_data')]
+
+
+def hash_title(title, content_digest):
+    """Return the digest of a title and a content digest."""
+    import hashlib
+    h = hashlib.blake2b(str(title).encode('utf-8', 'surrogatepass'), digest_size=16)
+    h.update(content_digest)
+    return h.digest()
+
+
+def hash_node(node, child_items):
+    """Return the content digest of a node's data and its (title, content digest) children."""
+    import hashlib
+    h = hashlib.blake2b(digest_size=16)
+    if node.has_data():
+        h.update(b'd')
+        h.update(str(node.serialize(node.get_data())).encode('utf-8', 'surrogatepass'))
+    for title, digest in child_items:
+        h.update(b'c')
+        h.update(hash_title(title, digest))
+    return h.digest()
+
+
+def content_digests(node):
+    """Return {id(node): digest} for the node and every node below it.
+
+    The content digest covers the data and the titles and content of the children, but not the node's own title, so
+    a renamed node keeps the same content digest.
+    """
+    digests = {}
+    stack = [(node, False)]
+    while stack:
+        n, visited = stack.pop()
+        children = iter_nodes(n)
+        if visited:
+            digests[id(n)] = hash_node(n, [(ch.title, digests[id(ch)]) for ch in children])
+        else:
+            stack.append((n, True))
+            stack.extend((ch, False) for ch in children)
+    return digests
+
+
+def get_digest_func(tree):
+    """Return a function that returns the content digest of a node in the given tree."""
+    if callable(getattr(tree, 'content_digest', None)):
+        return lambda node: node.content_digest()  # Cached on the nodes
+    return lambda node, digests=content_digests(tree): digests[id(node)]
+
+
+def diff_trees(old, new):
+    """Iterate through the changes needed to turn the old tree into the new tree.
+
+    Children are matched by title. Subtrees with the same content digest are skipped. Nodes that are missing from one
+    side are reported as 'renamed' if a sibling has the same content, 'moved' if a node somewhere else has the same
+    title and content, and otherwise as 'removed' or 'added'.
+
+    Args:
+        old (TNode): Old tree.
+        new (TNode): New tree.
+
+    Returns:
+        changes (iterator): Iterator of Change records.
+    """
+    old_digests = get_digest_func(old)
+    new_digests = get_digest_func(new)
+
+    added = []
+    removed = []
+    stack = [(old, new)]
+    while stack:
+        o, n = stack.pop()
+        if old_digests(o) == new_digests(n):
+            continue
+
+        if o.has_data() != n.has_data() or o.get_data() != n.get_data():
+            yield Change(DATA, n.full_title, o, n)
+
+        old_children = {ch.title: ch for ch in iter_nodes(o)}
+        new_children = {ch.title: ch for ch in iter_nodes(n)}
+
+        # Match renames by content with the removed siblings
+        missing = {}
+        for title, ch in old_children.items():
+            if title not in new_children:
+                missing.setdefault(old_digests(ch), []).append(ch)
+
+        common = []
+        for title, ch in new_children.items():
+            if title in old_children:
+                common.append((old_children[title], ch))
+            else:
+                matches = missing.get(new_digests(ch), None)
+                if matches:
+                    yield Change(RENAMED, ch.full_title, matches.pop(0), ch)
+                else:
+                    added.append(ch)
+
+        removed.extend(ch for matches in missing.values() for ch in matches)
+        stack.extend(reversed(common))
+
+    # Match moves by title and content
+    moved_from = {}
+    for ch in removed:
+        moved_from.setdefault((ch.title, old_digests(ch)), []).append(ch)
+
+    moved = set()
+    not_moved = []
+    for ch in added:
+        matches = moved_from.get((ch.title, new_digests(ch)), None)
+        if matches:
+            match = matches.pop(0)
+            moved.add(id(match))
+            yield Change(MOVED, ch.full_title, match, ch)
+        else:
+            not_moved.append(ch)
+
+    for ch in removed:
+        if id(ch) not in moved:
+            yield Change(REMOVED, ch.full_title, ch, None)
+    for ch in not_moved:
+        yield Change(ADDED, ch.full_title, None, ch)
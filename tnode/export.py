@@ -0,0 +1,168 @@
+"""Iterative dictionary export shared by TNode and TSnapshot.
+
+Nodes only need title, has_data(), get_data(), iter_children() and __len__(). The tree is walked with an explicit
+stack, so the depth of the tree is not limited by the recursion limit. Titles that contain the delimiter are escaped
+in the full titles.
+"""
+from .paths import escape_title
+
+
+__all__ = ['node_fields', 'to_dict', 'iter_dict']
+
+
+MISSING = object()
+
+
+def node_fields(node, fields=None):
+    """Return the dictionary of the node's fields without its children.
+
+    Args:
+        node (TNode/TSnapshot): Node to save.
+        fields (list)[None]: Attribute names to save. The default is ('title', 'data'). 'data' is only saved if the
+            node has data.
+    """
+    if fields is None:
+        tree = {'title': node.title}
+        if node.has_data():
+            tree['data'] = node.get_data()
+        return tree
+
+    tree = {}
+    for name in fields:
+        if name == 'data':
+            if node.has_data():
+                tree['data'] = node.get_data()
+        elif name != 'children':
+            value = getattr(node, name, MISSING)
+            if value is not MISSING:
+                tree[name] = value
+    return tree
+
+
+def _visit(node, full_title, depth, exclude, include, max_depth):
+    """Return (skip, include, expand) for the node.
+
+    skip is True if the node is not saved. include is None if the node and everything below it is included. expand is
+    True if the node's children are saved.
+    """
+    if exclude is not None and exclude.match(full_title, node):
+        return True, include, False
+    if include is not None:
+        if include.match(full_title, node):
+            include = None  # Include everything below this node
+        elif depth > 0 and not include.may_contain(full_title):
+            return True, include, False
+
+    expand = not node.has_data() and len(node) > 0 and (max_depth is None or depth < max_depth)
+    return False, include, expand
+
+
+def _prefix(node, full_title, delim):
+    title = node.title
+    return full_title + delim if title and isinstance(title, str) else ''
+
+
+def to_dict(node, full_title, delim=' > ', exclude=None, include=None, max_depth=None, fields=None):
+    """Return the node and everything below it as a nested dictionary or None if the node is not saved.
+
+    Children with data are listed before children without data. A node without data that has children always has a
+    'children' list even if none of the children are saved. Children of a node with data are not saved.
+
+    Args:
+        node (TNode/TSnapshot): Top node to save.
+        full_title (str): Full title of the top node.
+        delim (str)[' > ']: Delimiter for the full titles.
+        exclude (PathFilter)[None]: Nodes to leave out.
+        include (PathFilter)[None]: Nodes to save with their parents and everything below them.
+        max_depth (int)[None]: Number of levels below the top node to save.
+        fields (list)[None]: Attribute names to save for each node.
+    """
+    skip, include, expand = _visit(node, full_title, 0, exclude, include, max_depth)
+    if skip:
+        return None
+    tree = node_fields(node, fields)
+    if node.has_data() or len(node) == 0:
+        return tree if include is None else None
+
+    tree['children'] = []
+    if not expand:
+        return tree if include is None else None
+
+    # Frame: [tree, children with data, children without data, child iterator, prefix, depth, include]
+    stack = [[tree, tree['children'], [], node.iter_children(), _prefix(node, full_title, delim), 0, include]]
+    while stack:
+        frame = stack[-1]
+        children, subparents, it, prefix, depth, include = frame[1:]
+        for child in it:
+            child_title = prefix + escape_title(child.title, delim)
+            child_include = include
+            if exclude is not None or include is not None:
+                skip, child_include, _ = _visit(child, child_title, depth + 1, exclude, include, max_depth)
+                if skip:
+                    continue
+
+            d = node_fields(child, fields)
+            if child.has_data():
+                if child_include is None:
+                    children.append(d)
+            elif len(child) == 0:
+                if child_include is None:
+                    subparents.append(d)
+            else:
+                d['children'] = []
+                if max_depth is None or depth + 1 < max_depth:
+                    stack.append([d, d['children'], [], child.iter_children(), _prefix(child, child_title, delim),
+                                  depth + 1, child_include])
+                    break
+                elif child_include is None:
+                    subparents.append(d)
+        else:
+            # All children were visited. Add parents after children
+            stack.pop()
+            tree, children, subparents, _, _, _, include = frame
+            children.extend(subparents)
+            if include is not None and not children:
+                tree = None  # Nothing below this node was included
+
+            if not stack:
+                return tree
+            elif tree is not None:
+                stack[-1][2].append(tree)  # Nodes with a frame are parents without data
+
+
+def iter_dict(node, full_title, delim=' > ', exclude=None, include=None, max_depth=None, fields=None):
+    """Iterate (full_title, fragment) for every node that to_dict would save, in the same order as to_dict.
+
+    Fragments are the node dictionaries without 'children'. A parent is only yielded before the first node below it
+    that is yielded, so parents that only lead to nodes that were not included are never yielded.
+
+    Args:
+        See to_dict.
+    """
+    ancestors = []  # [full_title, fragment, yielded] of the parents of the current node
+    stack = [(node, full_title, 0, include)]
+    while stack:
+        node, full_title, depth, include = stack.pop()
+        del ancestors[depth:]
+
+        skip, include, expand = _visit(node, full_title, depth, exclude, include, max_depth)
+        if skip:
+            continue
+
+        fragment = node_fields(node, fields)
+        if include is None:
+            for parent in ancestors:
+                if not parent[2]:
+                    parent[2] = True
+                    yield parent[0], parent[1]
+            yield full_title, fragment
+
+        if expand:
+            ancestors.append([full_title, fragment, include is None])
+
+            # Children with data are listed first. Push in reverse order, so the first child is popped first.
+            prefix = _prefix(node, full_title, delim)
+            children = list(node.iter_children())
+            ordered = [ch for ch in children if ch.has_data()] + [ch for ch in children if not ch.has_data()]
+            for child in reversed(ordered):
+                stack.append((child, prefix + escape_title(child.title, delim), depth + 1, include))
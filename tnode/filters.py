@@ -0,0 +1,59 @@
+from .paths import join_titles, split_path
+
+
+__all__ = ['PathFilter']
+
+
+class PathFilter(object):
+    """Match nodes by full_title for to_dict's exclude and include options.
+
+    Args:
+        rules (str/list/set/callable): Full title or collection of full titles or title tuples. A full title that
+            ends with '*' is a prefix rule that matches every full title starting with the text before the '*'. A
+            callable is called with (full_title, node) and returns True if the node matches.
+        delim (str)[' > ']: Delimiter used to find the parents of the rules.
+    """
+    def __init__(self, rules, delim=' > '):
+        self.func = None
+        self.exact = set()
+        self.prefixes = ()
+        self.parents = set()
+
+        if callable(rules):
+            self.func = rules
+            return
+        if isinstance(rules, str):
+            rules = [rules]
+
+        prefixes = []
+        for rule in rules:
+            if isinstance(rule, str) and rule.endswith('*'):
+                rule = rule[:-1]
+                prefixes.append(rule)
+            else:
+                if not isinstance(rule, str):
+                    rule = join_titles(rule, delim)  # TPath or tuple of titles
+                self.exact.add(rule)
+
+            # Remember every parent of the rule, so only the branches that can contain a match are visited
+            split = split_path(rule, delim)
+            for i in range(1, len(split)):
+                self.parents.add(join_titles(split[:i], delim))
+        self.prefixes = tuple(prefixes)
+
+    def match(self, full_title, node):
+        """Return if the node matches the rules."""
+        if self.func is not None:
+            return self.func(full_title, node)
+        return full_title in self.exact or (bool(self.prefixes) and full_title.startswith(self.prefixes))
+
+    def may_contain(self, full_title):
+        """Return if a node below the full_title could match the rules."""
+        return self.func is not None or full_title in self.parents
+
+    @classmethod
+    def create(cls, rules, delim=' > '):
+        """Return a PathFilter for the rules or None if no rules were given."""
+        if rules is None or isinstance(rules, PathFilter):
+            return rules
+        return cls(rules, delim)
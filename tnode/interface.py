@@ -1,11 +1,18 @@
 import os
 import sys
-import traceback
-import pathlib
-import json
+import time
+import threading
 from dynamicmethod import dynamicmethod
 
 from .file_utils import FileWrapper
+from .locking import RWLock, MultiWriteLock, NULL_LOCK
+from .snapshot import TSnapshot
+from .paths import ESCAPE, TPath, delim_tails, escape_title, join_titles, split_path
+from .filters import PathFilter
+from . import export
+from . import observers
+from . import profiling
+from . import sorting
 
 
 __all__ = ['TNode', 'is_file_path', 'open_file']
@@ -21,21 +28,118 @@ def get_traceback(exc=None):
 
 
 def is_file_path(filename):
-    return isinstance(filename, (str, bytes, pathlib.Path)) or hasattr(filename, '__fspath__')
+    return isinstance(filename, (str, bytes)) or hasattr(filename, '__fspath__')  # pathlib.Path has __fspath__
 
 
 open_file = FileWrapper
 
 
+def remove_item(items, item):
+    """Remove the item from the list. Items are compared by identity first, so TNode.__eq__ is rarely called."""
+    for i, obj in enumerate(items):
+        if obj is item:
+            del items[i]
+            return
+    items.remove(item)
+
+
+def has_item(items, item):
+    """Return if the item is in the list. Nodes are only compared by identity, so TNode.__eq__ is not called."""
+    for obj in items:
+        if obj is item:
+            return True
+    return not isinstance(item, TNode) and item in items
+
+
+# Default value for lookups, so a missing node can be told apart from a None value without raising an exception.
+MISSING = object()
+
+# Serializes registering the built in file formats, so a thread never sees a partly filled registry.
+FORMATS_LOCK = threading.Lock()
+
+
+def find_title(parent, title):
+    """Return the parent's child with the given title or MISSING. Children sorted by title are searched with bisect."""
+    children = getattr(parent, '_children', ())
+    if getattr(parent, 'SORT_KEY', None) == 'title':
+        try:
+            i = sorting.bisect_left(children, title, sorting.title_key)
+            if i < len(children) and getattr(children[i], 'title', None) == title:
+                return children[i]
+            return MISSING
+        except TypeError:
+            pass  # Titles that cannot be compared
+
+    for child in children:
+        if getattr(child, 'title', None) == title:
+            return child
+    return MISSING
+
+
+def unpickle_tree(records, index=0):
+    """Rebuild a tree from the flat records created by TNode.__reduce__ and return the node at the given index.
+
+    Args:
+        records (list): List of (cls, state, parent_index) in pre-order. If cls is None state is a plain child value.
+        index (int)[0]: Index of the node that was pickled.
+    """
+    nodes = []
+    for cls, state, parent_index in records:
+        if cls is None:
+            node = state
+        else:
+            node = cls.__new__(cls)
+            node.__setstate__(state)
+
+        if parent_index >= 0:
+            parent = nodes[parent_index]
+            parent._children.append(node)
+            if cls is not None:
+                node._parent = parent
+        nodes.append(node)
+
+    return nodes[index]
+
+
 class TNode(object):
     DELIM = ' > '
 
+    # Number of trees that enabled thread safety, so trees that never use locking skip looking up their root lock.
+    _LOCKING = 0
+
+    # Cached immutable snapshot and content digest. Cleared by _invalidate() when this node or a node below it changes.
+    _snapshot = None
+    _content_digest = None
+
+    # Number of calls to _invalidate(). Caches built while a node changed are not kept, so they cannot become stale.
+    _CHANGES = 0
+
+    # If snapshots and content digests can be cached on nodes of this class. None only caches them if the class uses
+    # TNode's data methods, which call _invalidate() when the data changes. Subclasses that store data another way can
+    # set this to True if they call _invalidate() after every change or if their data never changes.
+    CACHE_DERIVED = None
+
+    # Cached or tree specific attributes that are not copied to a clone or pickled.
+    _TRANSIENT_ATTRS = ('_snapshot', '_content_digest', '_lock', '_observers')
+
+    # If True pickling a node also pickles the tree above it. Otherwise the pickled node becomes a top level node.
+    PICKLE_PARENT = False
+
+    # None to keep the children in the order they were added, 'title' to keep them sorted by title or a key function.
+    SORT_KEY = None
+
     @dynamicmethod
     def get_delimiter(cls_self):
+        """Return the full title delimiter. A node uses the delimiter of its root, so a tree has one delimiter."""
+        if isinstance(cls_self, TNode):
+            return cls_self.get_root().DELIM
         return cls_self.DELIM
 
     @dynamicmethod
     def set_delimiter(cls_self, delim):
+        """Set the full title delimiter. Setting it on a node sets it on the root for the whole tree."""
+        if isinstance(cls_self, TNode):
+            cls_self = cls_self.get_root()
         cls_self.DELIM = delim
 
     def __init__(self, title='', *child, children=None, parent=None, data=None, **kwargs):
@@ -72,18 +176,23 @@ class TNode(object):
         return self._parent
 
     def set_parent(self, parent):
-        try:
-            self._parent.remove_child(self)
-        except (AttributeError, ValueError, TypeError):
-            pass
+        with self.write_lock(parent):
+            try:
+                self._parent.remove_child(self)
+            except (AttributeError, ValueError, TypeError):
+                pass
 
-        if parent is not None:
-            self.validate_parent(parent)
-        self._parent = parent
-        try:
-            self._parent.add_child(self)
-        except (AttributeError, ValueError, TypeError):
-            pass
+            if parent is not None:
+                if profiling.ENABLED:
+                    with profiling.timer(profiling.VALIDATE_PARENT):
+                        self.validate_parent(parent)
+                else:
+                    self.validate_parent(parent)
+            self._parent = parent
+            try:
+                self._parent.add_child(self)
+            except (AttributeError, ValueError, TypeError):
+                pass
 
     @property
     def parent(self):
@@ -95,6 +204,111 @@ class TNode(object):
         """Set the parent. This property calls set_parent, so inheritance can just override set_parent()."""
         self.set_parent(parent)
 
+    def get_root(self):
+        """Return the top level node of this tree."""
+        node = self
+        parent = node.__dict__.get('_parent')  # Data can be set before __init__ sets the parent
+        while isinstance(parent, TNode):
+            node = parent
+            parent = node._parent
+        return node
+
+    def set_threadsafe(self, threadsafe=True):
+        """Enable or disable the reader/writer lock for this whole tree.
+
+        The lock is stored on the root node. Reads (find, iter, to_dict, ...) can run concurrently while mutations
+        (set_parent, add_child, remove_child, ...) are serialized. A subtree that is removed from the tree no longer
+        uses the tree's lock.
+        """
+        root = self.get_root()
+        if threadsafe:
+            if getattr(root, '_lock', None) is None:
+                root._lock = RWLock()
+                TNode._LOCKING += 1
+        elif getattr(root, '_lock', None) is not None:
+            root._lock = None
+            TNode._LOCKING -= 1
+
+    def is_threadsafe(self):
+        """Return if this tree uses a reader/writer lock."""
+        return self.get_lock() is not None
+
+    def get_lock(self):
+        """Return the tree's RWLock or None if this tree is not thread safe."""
+        if not TNode._LOCKING:
+            return None
+        return getattr(self.get_root(), '_lock', None)
+
+    def read_lock(self):
+        """Return a context manager that holds the tree's read lock. Does nothing if the tree is not thread safe."""
+        lock = self.get_lock()
+        if lock is None:
+            return NULL_LOCK
+        return lock.read
+
+    def write_lock(self, *nodes):
+        """Return a context manager that holds the write lock for this tree and the trees of the given nodes.
+
+        Does nothing if none of the trees are thread safe.
+        """
+        if not TNode._LOCKING:
+            return NULL_LOCK
+
+        def get_locks():
+            locks = [self.get_lock()]
+            locks.extend(node.get_lock() for node in nodes if isinstance(node, TNode))
+            return [lock for lock in locks if lock is not None]
+
+        if not get_locks():
+            return NULL_LOCK
+        return MultiWriteLock(get_locks)
+
+    def subscribe(self, callback, subtree=True):
+        """Call the callback with a list of TEvent's when this node (or a node below it) changes.
+
+        Events are (kind, node, value) where kind is 'child_added', 'child_removed', 'data' or 'title'. Use batch() to
+        receive one call with all of the events of many changes.
+
+        Args:
+            callback (callable): Function that takes a list of TEvent's.
+            subtree (bool)[True]: If True also receive the events of every node below this node.
+
+        Returns:
+            callback (callable): The given callback.
+        """
+        if '_observers' not in self.__dict__:
+            self._observers = []
+        self._observers.append((callback, subtree))
+        observers.track(self)
+        return callback
+
+    def unsubscribe(self, callback):
+        """Stop calling the given callback for this node."""
+        obs = self.__dict__.get('_observers', [])
+        for i, (cb, _) in enumerate(obs):
+            if cb == callback:
+                del obs[i]
+                if not obs:
+                    observers.untrack(self)
+                return
+
+    batch = staticmethod(observers.batch)
+
+    profile = staticmethod(profiling.profile)
+
+    def _notify(self, kind, value=None):
+        """Deliver a change event to the observers of this node and the subtree observers above it."""
+        if not observers.SUBSCRIBED:
+            return
+
+        event = observers.TEvent(kind, self, value)
+        node = self
+        while isinstance(node, TNode):
+            for callback, subtree in node.__dict__.get('_observers', ()):
+                if subtree or node is self:
+                    observers.deliver(callback, event)
+            node = node.__dict__.get('_parent')
+
     def get_parents(self, require_title=False):
         """Iterate through the parents"""
         p = self.parent
@@ -116,16 +330,50 @@ class TNode(object):
         """Set the title of this Node"""
         if title is None:
             title = ''
-        if self._parent and title in self._parent:
-            raise ValueError('Title already exists in parent!')
+        with self.write_lock():
+            if self._parent and find_title(self._parent, title) is not MISSING:
+                raise ValueError('Title already exists in parent!')
 
-        self._title = title
+            old_title, self._title = self._title, title
+            if self._parent is not None and self._parent.SORT_KEY is not None:
+                self._parent._resort_child(self)
+            self._invalidate()
+        self._notify(observers.TITLE, old_title)
 
     @property
     def full_title(self):
-        """Return the full title with the parent title's separated by the delimiter."""
-        tt = [self.title] + [p.title for p in self.get_parents(require_title=True)]
-        return self.get_delimiter().join(reversed(tt))
+        """Return the full title with the parent title's separated by the delimiter.
+
+        Titles that contain the delimiter are escaped with a backslash (see escape_title), so find() can split the
+        full title again.
+        """
+        start = profiling.ENABLED and time.perf_counter()
+
+        # Collect the titles up to the first parent without a title and find the root for the tree's delimiter
+        titles = [self.title]
+        collect = True
+        node = self
+        parent = self._parent
+        while isinstance(parent, TNode):
+            if collect:
+                title = parent.title
+                if title and isinstance(title, str):
+                    titles.append(title)
+                else:
+                    collect = False
+            node = parent
+            parent = node._parent
+        delim = node.DELIM
+
+        titles.reverse()
+        full_title = delim.join(titles)
+        tails = delim_tails(delim)
+        if (ESCAPE in full_title or full_title.count(delim) != len(titles) - 1 or
+                (tails and any(title.endswith(tails) for title in titles))):
+            full_title = join_titles(titles, delim)
+        if start:
+            profiling.record(profiling.FULL_TITLE, 1, time.perf_counter() - start)
+        return full_title
 
     key = full_title
 
@@ -142,38 +390,386 @@ class TNode(object):
 
     def add_child(self, child):
         """Add the given child"""
+        start = profiling.ENABLED and time.perf_counter()
         self.validate_child(child)
+        validated = start and time.perf_counter()
 
-        try:
-            if getattr(child, 'parent', None) != self:
-                child.parent = self
-        except AttributeError:
-            pass
+        with self.write_lock(child):
+            try:
+                if getattr(child, 'parent', None) != self:
+                    child.parent = self  # set_parent calls add_child again, which places the child
+            except AttributeError:
+                pass
 
-        if child not in self._children:
-            self._children.append(child)
+            placed = not has_item(self._children, child)
+            if placed:
+                self._place_child(child)
+                self._invalidate()
+                self._notify(observers.CHILD_ADDED, child)
 
+        # Only the call that placed the child records, so adding through set_parent is not counted twice
+        if start and placed:
+            profiling.record(profiling.VALIDATE_CHILD, 1, validated - start)
+            profiling.record(profiling.ADD_CHILD, 1, time.perf_counter() - start)
         return child
 
-    def remove_child(self, child):
-        """Remove the given child"""
-        self._children.remove(child)
+    def insert_child(self, index, child):
+        """Insert the child at the given index. If this node's children are sorted the index is ignored."""
+        self.validate_child(child)
+        if isinstance(child, TNode):
+            child.validate_parent(self)
+
+        with self.write_lock(child):
+            if isinstance(child, TNode):
+                child._detach()
+                child._parent = self
+            elif has_item(self._children, child):
+                remove_item(self._children, child)
+            self._place_child(child, index)
+            self._invalidate()
+            self._notify(observers.CHILD_ADDED, child)
+        return child
+
+    def _place_child(self, child, index=None):
+        """Put the child in the children list at the index or at its sorted position."""
+        if self.SORT_KEY is not None:
+            sorting.insort(self._children, child, sorting.get_key_func(self.SORT_KEY))
+        elif index is None:
+            self._children.append(child)
+        else:
+            self._children.insert(index, child)
+
+    def _resort_child(self, child):
+        """Move the child to its sorted position after its sort key changed."""
+        remove_item(self._children, child)
+        self._place_child(child)
+
+    def set_sort_key(self, sort_key='title'):
+        """Keep this node's children sorted.
+
+        Sorted children are inserted with bisect. Children sorted by 'title' are also found by title with bisect in
+        find, get, __getitem__ and __contains__. Subclasses can set the SORT_KEY class attribute instead.
+
+        Args:
+            sort_key (str/callable)['title']: 'title' to sort by title, a key function that takes a child or None to
+                stop sorting and keep the current order. Children are only moved when they are added or their title
+                changes, so a key function must not depend on anything else that changes.
+        """
+        sorting.get_key_func(sort_key)  # Validate
+        with self.write_lock():
+            self.SORT_KEY = sort_key
+            if sort_key is not None:
+                self.sort_children()
+
+    def sort_children(self, key=None):
+        """Sort the children by the given key function or by this node's SORT_KEY."""
+        if key is None:
+            key = sorting.get_key_func(self.SORT_KEY) or sorting.title_key
+        with self.write_lock():
+            self._children.sort(key=key)
+            self._invalidate()
+
+    def child_index(self, child):
+        """Return the index of the child. Sorted children are found with bisect."""
+        children = self._children
+        key = sorting.get_key_func(self.SORT_KEY)
+        if key is not None:
+            value = key(child)
+            i = sorting.bisect_left(children, value, key)
+            while i < len(children) and key(children[i]) == value:
+                if children[i] is child:
+                    return i
+                i += 1
+            raise ValueError('{} is not a child of {}'.format(child, self))
+
+        for i, ch in enumerate(children):
+            if ch is child:
+                return i
+        return children.index(child)
+
+    def child_range(self, start=None, stop=None):
+        """Return the sorted children whose sort key is >= start and < stop. None means no limit."""
+        key = sorting.get_key_func(self.SORT_KEY)
+        if key is None:
+            raise ValueError('child_range requires sorted children! Use set_sort_key first.')
+
+        with self.read_lock():
+            children = self._children
+            lo = 0 if start is None else sorting.bisect_left(children, start, key)
+            hi = len(children) if stop is None else sorting.bisect_left(children, stop, key, lo)
+            return children[lo:hi]
+
+    def add_children(self, children):
+        """Add several children at once.
+
+        Validation is run once per distinct child type instead of once per child, so this expects validate_child and
+        validate_parent to only depend on the type of the object.
+
+        Args:
+            children (iterable): Child objects to add.
+
+        Returns:
+            children (list): List of the children that were given.
+        """
+        start = profiling.ENABLED and time.perf_counter()
+        children = list(children)
+
+        validated = set()
+        for child in children:
+            child_type = type(child)
+            if child_type not in validated:
+                if start:
+                    with profiling.timer(profiling.VALIDATE_CHILD):
+                        self.validate_child(child)
+                    if isinstance(child, TNode):
+                        with profiling.timer(profiling.VALIDATE_PARENT):
+                            child.validate_parent(self)
+                else:
+                    self.validate_child(child)
+                    if isinstance(child, TNode):
+                        child.validate_parent(self)
+                validated.add(child_type)
+
+        with self.write_lock(*children), observers.batch():
+            for child in children:
+                if isinstance(child, TNode):
+                    if child._parent is self:
+                        continue
+                    child._detach()
+                    child._parent = self
+                    self._children.append(child)
+                elif child not in self._children:
+                    self._children.append(child)
+                else:
+                    continue
+                self._notify(observers.CHILD_ADDED, child)
+            if self.SORT_KEY is not None:
+                self.sort_children()
+            self._invalidate()
+
+        if start:
+            profiling.record(profiling.ADD_CHILD, len(children), time.perf_counter() - start)
+        return children
+
+    def move(self, node, new_parent, index=None):
+        """Move one or more nodes (and everything below them) to a new parent.
+
+        The nodes are removed from their old parents with one pass over each old parent's children and inserted into
+        the new parent at once. Validation is run once per distinct node type like add_children. Cached state is only
+        cleared above the old and new parents, because nothing below a moved node changes.
 
+        Args:
+            node (TNode/str/TPath/tuple/list): Node or full title of the node to move. A list moves several nodes.
+                Full titles are resolved from this node.
+            new_parent (TNode/str/TPath/tuple): New parent node or its full title.
+            index (int)[None]: Position of the first moved node in the new parent's children after the nodes were
+                removed. None to append the nodes. This is ignored if the new parent's children are sorted.
+
+        Returns:
+            nodes (list): List of the nodes that were moved.
+        """
+        keys = node if isinstance(node, list) else [node]
+        nodes = []
+        seen = set()
+        for key in keys:
+            if not isinstance(key, TNode):
+                key = self.find(key)
+            if id(key) not in seen:
+                seen.add(id(key))
+                nodes.append(key)
+        if not isinstance(new_parent, TNode):
+            new_parent = self if not new_parent or new_parent == self.full_title else self.find(new_parent)
+
+        # A node cannot be moved below itself
+        parent = new_parent
+        while isinstance(parent, TNode):
+            if id(parent) in seen:
+                raise ValueError('Cannot move {} below itself!'.format(parent))
+            parent = parent._parent
+
+        validated = set()
+        for child in nodes:
+            if type(child) not in validated:
+                new_parent.validate_child(child)
+                child.validate_parent(new_parent)
+                validated.add(type(child))
+
+        with self.write_lock(new_parent, *nodes), observers.batch():
+            # Remove the nodes from their old parents
+            old_parents = {}
+            for child in nodes:
+                if child._parent is not None:
+                    old_parents.setdefault(id(child._parent), (child._parent, set()))[1].add(id(child))
+            for old_parent, ids in old_parents.values():
+                children = old_parent._children
+                if len(ids) == 1:
+                    for i, ch in enumerate(children):
+                        if id(ch) in ids:
+                            del children[i]
+                            break
+                else:
+                    old_parent._children = [ch for ch in children if id(ch) not in ids]
+                old_parent._invalidate()
+
+            for child in nodes:
+                old_parent, child._parent = child._parent, new_parent
+                if old_parent is not None:
+                    old_parent._notify(observers.CHILD_REMOVED, child)
+
+            # Add the nodes to the new parent
+            if index is None:
+                new_parent._children.extend(nodes)
+            else:
+                new_parent._children[index:index] = nodes
+            if new_parent.SORT_KEY is not None:
+                new_parent.sort_children()
+            new_parent._invalidate()
+            for child in nodes:
+                new_parent._notify(observers.CHILD_ADDED, child)
+
+        return nodes
+
+    def _detach(self):
+        """Remove this node from its parent's children without validation or calling back into the parent."""
+        parent = self._parent
+        self._parent = None
         try:
-            if getattr(child, 'parent', None):
-                child.parent = None
-        except AttributeError:
+            remove_item(parent._children, self)
+            parent._invalidate()
+            parent._notify(observers.CHILD_REMOVED, self)
+        except (AttributeError, ValueError):
             pass
+        return parent
+
+    @classmethod
+    def _can_cache(cls):
+        """Return if snapshots and content digests can be cached on nodes of this class. See CACHE_DERIVED."""
+        if cls.CACHE_DERIVED is not None:
+            return cls.CACHE_DERIVED
+        return (cls.set_data is TNode.set_data and cls.get_data is TNode.get_data and
+                cls.has_data is TNode.has_data and cls.data is TNode.data)
+
+    @classmethod
+    def _validates_by_type(cls):
+        """Return if nodes of this class can be added with add_children, which validates once per type.
+
+        The class must use validators from TYPE_VALIDATORS and TNode's set_parent and add_child.
+        """
+        return (cls.set_parent is TNode.set_parent and cls.add_child is TNode.add_child and
+                cls.validate_parent in TYPE_VALIDATORS and cls.validate_child in TYPE_VALIDATORS)
+
+    def _invalidate(self):
+        """Clear the cached derived state of this node and every parent above it.
+
+        Must be called after this node's title, data or children change. A node's cache is only valid if all of its
+        children's caches are valid, so this can stop at the first parent that has nothing cached.
+        """
+        TNode._CHANGES += 1
+        node = self
+        while isinstance(node, TNode) and (node._snapshot is not None or node._content_digest is not None):
+            node._snapshot = None
+            node._content_digest = None
+            node = node.__dict__.get('_parent')
+
+    def remove_child(self, child, destroy=False):
+        """Remove the given child.
+
+        Args:
+            child (object): Child to remove.
+            destroy (bool)[False]: If True also break every parent/child reference below the child. See destroy().
+        """
+        with self.write_lock():
+            remove_item(self._children, child)
+            self._invalidate()
+            self._notify(observers.CHILD_REMOVED, child)
+
+            if isinstance(child, TNode):
+                if child._parent is self:
+                    child._parent = None
+                if destroy:
+                    child.destroy()
         return child
 
-    def clear(self):
-        """Clear all children."""
-        for i in reversed(range(len(self._children))):
-            try:
-                child = self._children.pop(i)
-                child.parent = None
-            except (AttributeError, Exception):
-                pass
+    def remove_children(self, children, destroy=False):
+        """Remove several children in one pass over this node's children.
+
+        Args:
+            children (iterable): Children to remove. A ValueError is raised before anything is removed if one of the
+                children is not a child of this node.
+            destroy (bool)[False]: If True also break every parent/child reference below the removed children.
+
+        Returns:
+            children (list): List of the removed children in their previous order.
+        """
+        remove = {id(child) for child in children}
+        with self.write_lock(), observers.batch():
+            kept = []
+            removed = []
+            for child in self._children:
+                if id(child) in remove:
+                    removed.append(child)
+                else:
+                    kept.append(child)
+            if len(removed) != len(remove):
+                raise ValueError('Not all of the given children are children of this node!')
+            if not removed:
+                return removed
+
+            self._children = kept
+            self._release(removed, destroy)
+        return removed
+
+    def clear(self, destroy=False):
+        """Clear all children.
+
+        Args:
+            destroy (bool)[False]: If True also break every parent/child reference below the children, so the removed
+                subtrees are freed right away instead of waiting for the garbage collector.
+        """
+        with self.write_lock(), observers.batch():
+            children = self._take_children()
+            if children:
+                self._release(children, destroy)
+
+    def _take_children(self):
+        """Remove and return the list of children without detaching them."""
+        children, self._children = self._children, []
+        return children
+
+    def _release(self, children, destroy=False):
+        """Detach children that were already removed from this node's children list."""
+        for child in children:
+            if isinstance(child, TNode) and child._parent is self:
+                child._parent = None
+            self._notify(observers.CHILD_REMOVED, child)
+        self._invalidate()
+
+        if destroy:
+            for child in children:
+                if isinstance(child, TNode):
+                    child.destroy()
+
+    def destroy(self):
+        """Remove this node from its parent and break every parent/child reference below it.
+
+        The removed nodes do not form reference cycles anymore, so they are freed as soon as they are not used instead
+        of waiting for the garbage collector. No events are sent for the nodes below this node and the removed nodes
+        lose their observers.
+        """
+        if self._parent is not None:
+            self._detach()
+
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            for child in node._take_children():
+                if isinstance(child, TNode):
+                    child._parent = None
+                    stack.append(child)
+            node.__dict__.pop('_snapshot', None)
+            node.__dict__.pop('_content_digest', None)
+            if node.__dict__.pop('_observers', None) is not None:
+                observers.untrack(node)
 
     def exists(self, child):
         """Return if the child exists."""
@@ -196,44 +792,147 @@ class TNode(object):
         for k, v in d.items():
             setattr(self, k, v)
 
+    def merge(self, tree, conflict='replace'):
+        """Move the children of the given tree into this node. Nodes with the same full_title are merged.
+
+        Two nodes without data are merged by merging their children. Otherwise the nodes conflict.
+
+        Args:
+            tree (TNode): Tree whose children are moved into this node. The tree is left empty.
+            conflict (str)['replace']: What to do with conflicting nodes.
+                'replace' to use the node from the given tree at the position of the existing node.
+                'keep' to keep the existing node.
+                'error' to raise a ValueError. Nodes that were already merged stay merged.
+
+        Returns:
+            self (TNode): This node.
+        """
+        if conflict not in ('replace', 'keep', 'error'):
+            raise ValueError('Invalid conflict given! This must be "replace", "keep", or "error".')
+
+        with self.write_lock(tree):
+            stack = [(self, tree)]
+            while stack:
+                dst, src = stack.pop()
+                existing = {ch.title: ch for ch in dst._children if isinstance(ch, TNode)}
+                for child in list(src._children):
+                    old = existing.get(child.title, None) if isinstance(child, TNode) else None
+                    if old is None:
+                        dst.add_child(child)
+                        if isinstance(child, TNode):
+                            existing[child.title] = child
+                    elif not child.has_data() and not old.has_data():
+                        stack.append((old, child))
+                    elif conflict == 'replace':
+                        index = dst.child_index(old)
+                        dst.remove_child(old)
+                        dst.insert_child(index, child)
+                        existing[child.title] = child
+                    elif conflict == 'error':
+                        raise ValueError('Duplicate full_title "{}"!'.format(old.full_title))
+
+        return self
+
     def find_parent(self, full_title, create_missing=False):
         """Find the full_title's parent and base title."""
-        if not isinstance(full_title, str):
+        parent, title, missing = self._find_parent(full_title, create_missing)
+        if missing is not None:
+            raise KeyError('"{}" not found in {}'.format(missing, parent))
+        return parent, title
+
+    def _find_parent(self, full_title, create_missing=False):
+        """Find the full_title's parent and base title without raising an exception when a parent is missing.
+
+        Args:
+            full_title (str/TPath/tuple/list/TNode): Full title string, pre-split titles or node to find.
+            create_missing (bool)[False]: If True create the missing parents.
+
+        Returns:
+            parent (TNode): Lowest level parent that was found.
+            title (str): Base title of the full_title.
+            missing (str): Title of the first parent that was not found or None if the parent was found.
+        """
+        start = profiling.ENABLED and time.perf_counter()
+        if isinstance(full_title, str):
+            split = split_path(full_title, self.get_root().DELIM)
+        elif isinstance(full_title, TPath):
+            split = full_title.parts
+        elif isinstance(full_title, (tuple, list)):
+            split = full_title
+        else:
             try:
-                full_title = full_title.full_title
+                split = split_path(full_title.full_title, full_title.get_root().DELIM)
             except (AttributeError, Exception) as err:
-                raise TypeError('Invalid full_title given! This must be a str or TNode') from err
+                raise TypeError('Invalid full_title given! This must be a str, TPath, tuple, list or TNode') from err
 
-        split = full_title.split(self.get_delimiter())
-        if split[0] == self.title:
+        if split and split[0] == self.title:
             split = split[1:]
 
         parent = self
+        missing = None
         for t in split[:-1]:
-            for child in getattr(parent, 'children', []):
-                if child.title == t:
-                    parent = child
-                    break
+            child = find_title(parent, t)
+            if child is not MISSING:
+                parent = child
             else:
                 if create_missing:
                     parent = parent.add_child(self.__class__(t))
                 else:
-                    raise KeyError('"{}" not found in {}'.format(t, parent))
+                    missing = t
+                    break
 
+        if start:
+            profiling.record(profiling.PATH_SEGMENT, len(split))
+            profiling.record(profiling.LOOKUP, 1, time.perf_counter() - start)
         try:
-            return parent, split[-1]
+            return parent, split[-1], missing
         except IndexError:
-            return parent, ''
+            return parent, '', missing
 
     def find(self, full_title):
         """Find and return the child that may be several levels deep."""
-        parent, title = self.find_parent(full_title)
+        with self.read_lock():
+            parent, title, missing = self._find_parent(full_title)
+            if missing is None:
+                child = find_title(parent, title)
+                if child is not MISSING:
+                    return child
+                missing = title
+
+        raise KeyError('"{}" not found in {}'.format(missing, parent))
+
+    def get(self, full_title, default=None):
+        """Return the child for the full_title, index or node or the default if it does not exist.
+
+        This is the same lookup as __getitem__, but a missing node does not raise (and catch) an exception.
+        """
+        with self.read_lock():
+            return self._get(full_title, default)
 
-        for child in getattr(parent, 'children', []):
-            if child.title == title:
-                return child
+    def _get(self, full_title, default=None):
+        if isinstance(full_title, int):
+            children = self._children
+            if -len(children) <= full_title < len(children):
+                return children[full_title]
+            return default
+        elif isinstance(full_title, TNode):
+            for child in self._children:
+                if child == full_title:
+                    return child
 
-        raise KeyError('"{}" not found in {}'.format(title, parent))
+            # Get the full title
+            full_title = full_title.full_title
+
+        # Get the lowest level parent
+        parent, title, missing = self._find_parent(full_title)
+        if missing is not None:
+            return default
+
+        # Find if there is a child with the same title
+        child = find_title(parent, title)
+        if child is MISSING:
+            return default
+        return child
 
     def iter_children(self):
         """Iterate through my direct children only."""
@@ -246,17 +945,35 @@ class TNode(object):
         return list(self._children)
 
     def iter(self):
-        """Iterate through each child and their children."""
+        """Iterate through each child and their children.
+
+        If the tree is thread safe the nodes are collected while holding the read lock, so the caller can safely
+        modify the tree while iterating.
+        """
+        lock = self.get_lock()
+        if lock is not None:
+            with lock.read:
+                return iter(list(self._iter()))
+        return self._iter()
+
+    def _iter(self):
         for child in self.iter_children():
             yield child
             if len(child) > 0:
                 try:
-                    yield from child.iter()
+                    yield from child._iter()
                 except (AttributeError, TypeError):
                     pass
 
     def iter_nearest(self):
         """Iterate the nearest children first."""
+        lock = self.get_lock()
+        if lock is not None:
+            with lock.read:
+                return iter(list(self._iter_nearest()))
+        return self._iter_nearest()
+
+    def _iter_nearest(self):
         children = self.children
         while children:
             sub = []
@@ -266,6 +983,47 @@ class TNode(object):
                     sub.append(ch)
             children = sub
 
+    def iter_items(self, leaves_only=True, sep=None):
+        """Iterate (full_title, data) for the nodes below this node in the same order as iter().
+
+        Full titles are built while walking the tree. Each parent's prefix is built once and shared by its children
+        instead of walking up the parents for every node.
+
+        Args:
+            leaves_only (bool)[True]: If True only yield nodes without children.
+            sep (str)[None]: Delimiter for the full titles. None uses this tree's delimiter.
+        """
+        if sep is None:
+            sep = self.get_root().DELIM
+        lock = self.get_lock()
+        if lock is not None:
+            with lock.read:
+                return iter(list(self._iter_items(leaves_only, sep)))
+        return self._iter_items(leaves_only, sep)
+
+    def _iter_items(self, leaves_only, sep):
+        titles = [self.title] + [p.title for p in self.get_parents(require_title=True)]
+        prefix = join_titles(reversed(titles), sep) + sep if self.title and isinstance(self.title, str) else ''
+
+        stack = [(self.iter_children(), prefix)]
+        while stack:
+            children, prefix = stack[-1]
+            for child in children:
+                title = child.title
+                full_title = prefix + escape_title(title, sep)
+                if len(child) > 0:
+                    if not leaves_only:
+                        yield full_title, child.get_data()
+                    stack.append((child.iter_children(), full_title + sep if title and isinstance(title, str) else ''))
+                    break
+                yield full_title, child.get_data()
+            else:
+                stack.pop()
+
+    def to_flat_dict(self, leaves_only=True, sep=None):
+        """Return a flat dictionary of {full_title: data} for the nodes below this node. See iter_items."""
+        return dict(self.iter_items(leaves_only, sep))
+
     def __iter__(self):
         return self.iter()
 
@@ -277,42 +1035,38 @@ class TNode(object):
 
     def __contains__(self, item):
         try:
-            self.__getitem__(item)
-            return True
-        except (IndexError, KeyError, Exception) as err:
-            return False
+            return self.get(item, MISSING) is not MISSING
+        except (TypeError, Exception):
+            return False  # Invalid item type
 
     def __getitem__(self, full_title):
+        with self.read_lock():
+            return self._getitem(full_title)
+
+    def _getitem(self, full_title):
         if isinstance(full_title, int):
             return self._children[full_title]
-        elif isinstance(full_title, TNode):
-            for child in self._children:
-                if child == full_title:
-                    return child
-
-            # Get the full title
-            full_title = full_title.full_title
-
-        # Get the lowest level parent
-        parent, title = self.find_parent(full_title)
 
-        # Find if there is a child with the same title
-        for ch in getattr(parent, 'children', []):
-            if getattr(ch, 'title', None) == title:
-                return ch
-
-        raise KeyError('"{}" not found in {}'.format(title, parent))
+        child = self._get(full_title, MISSING)
+        if child is MISSING:
+            raise KeyError('"{}" not found in {}'.format(full_title, self))
+        return child
 
     def __setitem__(self, full_title, child):
         parent = self
         if isinstance(full_title, int):
             index = full_title
             try:
-                parent._children[index] = child
+                old, parent._children[index] = parent._children[index], child
+                parent._notify(observers.CHILD_REMOVED, old)
             except IndexError:
                 parent._children.append(child)
             except AttributeError:
                 pass
+            if parent.SORT_KEY is not None:
+                parent._resort_child(child)
+            parent._invalidate()
+            parent._notify(observers.CHILD_ADDED, child)
 
             try:
                 parent.add_child(child)
@@ -371,44 +1125,308 @@ class TNode(object):
         return getattr(self, '_data', None)
 
     def set_data(self, data):
-        """Set the stored data."""
-        setattr(self, '_data', data)
+        """Set the stored data. Subclasses that store data differently must call _invalidate() after a change."""
+        with self.write_lock():
+            setattr(self, '_data', data)
+            self._invalidate()
+            self._notify(observers.DATA, data)
 
     data = property(get_data, set_data)
 
-    def to_dict(self, exclude=None, **kwargs):
-        """Return this tree as a dictionary of data.
+    def snapshot(self):
+        """Return an immutable TSnapshot of this node and everything below it.
+
+        Snapshots are cached and structurally shared. After a change only the snapshots from the changed node up to
+        the root are rebuilt, while unchanged subtrees reuse their existing snapshots. Readers can use a snapshot
+        (iter, find, to_dict, to_json) in another thread while the live tree keeps changing. Data values are not
+        copied, so data objects must not be modified in place.
+
+        Snapshots are only cached on nodes that can cache (see CACHE_DERIVED) and whose children all have a cached
+        snapshot. Other snapshots are built again on every call. Snapshots built while a node changed are not cached.
+        """
+        delim = self.get_root().DELIM
+        if self._snapshot is not None and self._snapshot._delim == delim:
+            return self._snapshot
+
+        with self.read_lock():
+            # Build bottom up with a stack, so deep trees do not hit the recursion limit. Snapshots that were built
+            # with another delimiter (set_delimiter or a subtree from another tree) are rebuilt.
+            changes = TNode._CHANGES
+            cached = []
+            snapshots = {}
+            stack = [(self, False)]
+            while stack:
+                node, visited = stack.pop()
+                if visited:
+                    children = []
+                    cache = node._can_cache()
+                    for ch in node._children:
+                        if isinstance(ch, TNode):
+                            snap = snapshots.pop(id(ch), ch._snapshot)
+                            cache = cache and ch._snapshot is snap
+                            ch = snap
+                        children.append(ch)
+                    snap = TSnapshot(node.title, tuple(children), node.get_data(), node.has_data(), delim, type(node))
+                    snapshots[id(node)] = snap
+                    if cache:
+                        node._snapshot = snap
+                        cached.append(node)
+                else:
+                    stack.append((node, True))
+                    stack.extend((ch, False) for ch in node._children
+                                 if isinstance(ch, TNode) and (ch._snapshot is None or ch._snapshot._delim != delim))
+
+            if changes != TNode._CHANGES:
+                # A node changed while building. Its _invalidate() may have run before the snapshots were cached.
+                for node in cached:
+                    node._snapshot = None
+
+        return snapshots[id(self)]
+
+    def clone(self, deep=True, share_data=False):
+        """Return a copy of this node that does not have a parent.
+
+        Only this node and the nodes below it are copied. The copy is built with a stack instead of recursion and
+        skips validation, because the copied structure is already known to be valid.
 
         Args:
-            exclude (list): List of full_title's to exclude. This can also exclude a parent and everything below it.
+            deep (bool)[True]: If True copy all children and their children. Otherwise the copy has no children.
+            share_data (bool)[False]: If True the copies reference the same data objects instead of deep copies.
 
         Returns:
-            tree (dict): Ex {'title': title, 'data': data if data, 'children': [{'title': title, 'data': data}]}
+            node (TNode): New detached copy of this node.
         """
-        if exclude is None:
-            exclude = []
+        with self.read_lock():
+            root = self._clone_node(share_data)
+            if deep:
+                stack = [(self, root)]
+                while stack:
+                    src, dst = stack.pop()
+                    children = dst._children
+                    for child in src._children:
+                        if isinstance(child, TNode):
+                            new = child._clone_node(share_data)
+                            new._parent = dst
+                            if len(child._children) > 0:
+                                stack.append((child, new))
+                            child = new
+                        children.append(child)
+        return root
+
+    def _clone_node(self, share_data=False):
+        """Return a copy of only this node without a parent or children."""
+        cls = self.__class__
+        new = cls.__new__(cls)
+        state = self.__getstate__()
+        if not share_data and '_data' in state:
+            import copy
+            state['_data'] = copy.deepcopy(state['_data'])
+        new.__setstate__(state)
+        return new
+
+    def __getstate__(self):
+        """Return the attributes of only this node without the parent, children or cached state."""
+        state = self.__dict__.copy()
+        for attr in ('_parent', '_children') + self._TRANSIENT_ATTRS:
+            state.pop(attr, None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._parent = None
+        self._children = []
 
-        tree = {}
-        if self.full_title not in exclude:
-            tree = {'title': self.title}
+    def __reduce__(self):
+        """Pickle the subtree as a flat list of (cls, state, parent_index) records.
 
-            children = []  # detached
-            if self.has_data():
-                tree['data'] = self.get_data()
-            elif len(self) > 0:
-                children = tree['children'] = []  # Only attach if children
+        This avoids recursing through the parent and children, so deep trees do not hit the recursion limit and
+        pickling a leaf does not pickle the whole tree. Set PICKLE_PARENT to True to keep the tree above this node.
+        """
+        top = self.get_root() if self.PICKLE_PARENT else self
+
+        with top.read_lock():
+            records = []
+            index = 0
+            stack = [(top, -1)]
+            while stack:
+                node, parent_index = stack.pop()
+                if node is self:
+                    index = len(records)
+
+                if isinstance(node, TNode):
+                    records.append((node.__class__, node.__getstate__(), parent_index))
+                    my_index = len(records) - 1
+                    stack.extend((child, my_index) for child in reversed(node._children))
+                else:
+                    records.append((None, node, parent_index))
 
-            subparents = []
-            for child in self.iter_children():
-                if child.has_data():
-                    children.append(child.to_dict(exclude=exclude, **kwargs))
+        return unpickle_tree, (records, index)
+
+    def content_digest(self):
+        """Return a digest (bytes) of this node's serialized data and the titles and digests of its children.
+
+        The digest does not include this node's own title. Digests are only computed when requested and are cached.
+        After a change only the digests from the changed node up to the root are computed again. Digests are only
+        cached on nodes that can cache (see CACHE_DERIVED) and whose children all have a cached digest, and only if no
+        node changed while hashing.
+        """
+        if self._content_digest is not None:
+            return self._content_digest
+
+        from .diff import hash_node
+
+        with self.read_lock():
+            changes = TNode._CHANGES
+            cached = []
+            digests = {}
+            stack = [(self, False)]
+            while stack:
+                node, visited = stack.pop()
+                children = [ch for ch in node._children if isinstance(ch, TNode)]
+                if visited:
+                    items = []
+                    cache = node._can_cache()
+                    for ch in children:
+                        digest = digests.pop(id(ch), ch._content_digest)
+                        cache = cache and ch._content_digest is digest
+                        items.append((ch.title, digest))
+                    digest = digests[id(node)] = hash_node(node, items)
+                    if cache:
+                        node._content_digest = digest
+                        cached.append(node)
                 else:
-                    subparents.append(child.to_dict(exclude=exclude, **kwargs))
+                    stack.append((node, True))
+                    stack.extend((ch, False) for ch in children if ch._content_digest is None)
 
-            # Add parents after children
-            children.extend(subparents)
+            if changes != TNode._CHANGES:
+                # A node changed while hashing. Its _invalidate() may have run before the digests were cached.
+                for node in cached:
+                    node._content_digest = None
 
-        return tree
+        return digests[id(self)]
+
+    def digest(self):
+        """Return a digest (bytes) of this node's title, serialized data and the digests of its children.
+
+        Two subtrees with the same digest have the same titles, data and structure. This can be used to cheaply check
+        if replicas are equal, to skip unchanged subtrees, or as a cache key.
+        """
+        from .diff import hash_title
+        return hash_title(self.title, self.content_digest())
+
+    def diff(self, other):
+        """Iterate through the changes needed to turn this tree into the other tree.
+
+        Children are matched by title and subtrees with the same content are skipped.
+
+        Args:
+            other (TNode): New version of this tree.
+
+        Returns:
+            changes (iterator): Iterator of tnode.diff.Change(kind, full_title, old, new) records where kind is
+                'added', 'removed', 'moved', 'data' or 'renamed'.
+        """
+        from .diff import diff_trees
+        return diff_trees(self, other)
+
+    def make_patch(self, other):
+        """Return a patch (list of operation dictionaries) that turns this tree into the other tree.
+
+        Operations are {'op': 'set_data', 'path', 'data'}, {'op': 'remove', 'path'}, {'op': 'move', 'path', 'to'},
+        {'op': 'rename', 'path', 'title'} and {'op': 'add', 'path', 'node'} where 'path' is a full_title and 'node' is
+        a to_dict() dictionary. The patch can be saved with json if the data can be saved with json.
+        """
+        from .patch import make_patch
+        return make_patch(self, other)
+
+    def apply_patch(self, patch):
+        """Apply a patch from make_patch to this tree.
+
+        The operations are applied as one batch. If an operation fails (Example: validate_parent or validate_child
+        raises an error) every operation that was already applied is undone and the error is raised.
+
+        Returns:
+            self (TNode): This tree.
+        """
+        from .patch import apply_patch
+        return apply_patch(self, patch)
+
+    def parallel_map(self, func, executor=None, chunk='subtree'):
+        """Run func on the data of every node below this node in a process pool and set the results as the data.
+
+        The tree is split into balanced groups of subtrees and only the data values are sent to the workers.
+
+        Args:
+            func (callable): Picklable function that takes a data value and returns the new data value.
+            executor (concurrent.futures.Executor)[None]: Executor to use. If None a ProcessPoolExecutor is created.
+            chunk (str/int)['subtree']: 'subtree' to group whole subtrees into balanced chunks or an int to use
+                chunks of this many nodes.
+
+        Returns:
+            self (TNode): This node.
+        """
+        from .parallel import parallel_map
+        return parallel_map(self, func, executor=executor, chunk=chunk)
+
+    def parallel_reduce(self, func, reduce_func, initial=MISSING, executor=None, chunk='subtree'):
+        """Map the data of every node below this node and reduce the results in a process pool.
+
+        Args:
+            func (callable): Picklable function that takes a data value and returns the value to reduce.
+            reduce_func (callable): Picklable associative function that takes two values and returns one value.
+            initial (object)[MISSING]: Initial value for the reduction. If not given the first mapped value is used.
+            executor (concurrent.futures.Executor)[None]: Executor to use. If None a ProcessPoolExecutor is created.
+            chunk (str/int)['subtree']: 'subtree' to group whole subtrees into balanced chunks or an int to use
+                chunks of this many nodes.
+
+        Returns:
+            value (object): The reduced value.
+        """
+        from .parallel import parallel_reduce
+        return parallel_reduce(self, func, reduce_func, initial=initial, executor=executor, chunk=chunk)
+
+    def to_dict(self, exclude=None, include=None, max_depth=None, fields=None, **kwargs):
+        """Return this tree as a dictionary of data.
+
+        Args:
+            exclude (list/set/callable)[None]: Full titles to exclude. Excluding a parent excludes everything below it
+                without visiting it. A full title ending with '*' excludes every full title that starts with the
+                text before the '*'. A callable is called with (full_title, node) and returns True to exclude it.
+            include (list/set/callable)[None]: Full titles to include with the same rules as exclude. Everything
+                below an included node and the parents of included nodes are included. Only the branches that lead
+                to an included full title are visited unless a callable is given.
+            max_depth (int)[None]: Number of levels below this node to include. 0 only includes this node.
+            fields (list)[None]: Attribute names to save for each node. The default is ('title', 'data'). 'data' is
+                only saved for nodes that have data. Other names are saved if the node has the attribute.
+
+        Returns:
+            tree (dict): Ex {'title': title, 'data': data if data, 'children': [{'title': title, 'data': data}]}
+        """
+        delim = self.get_root().DELIM
+        exclude = PathFilter.create(exclude, delim)
+        include = PathFilter.create(include, delim)
+
+        with self.read_lock():
+            tree = export.to_dict(self, self.full_title, delim, exclude, include, max_depth, fields)
+        return tree if tree is not None else {}
+
+    def iter_dict(self, exclude=None, include=None, max_depth=None, fields=None):
+        """Iterate (full_title, fragment) for each node that to_dict would save without building the nested dict.
+
+        Fragments are the node dictionaries without 'children' ({'title': title, 'data': data if data}). Nodes are
+        in the same order as to_dict and every parent comes before its children. The arguments are the same as
+        to_dict. If the tree is thread safe the fragments are collected while holding the read lock.
+        """
+        delim = self.get_root().DELIM
+        exclude = PathFilter.create(exclude, delim)
+        include = PathFilter.create(include, delim)
+
+        items = export.iter_dict(self, self.full_title, delim, exclude, include, max_depth, fields)
+        lock = self.get_lock()
+        if lock is not None:
+            with lock.read:
+                return iter(list(items))
+        return items
 
     asdict = to_dict
 
@@ -435,17 +1453,89 @@ class TNode(object):
             except (AttributeError, TypeError, Exception):
                 pass
 
-        for child_d in children:
-            child = cls.from_dict(child_d, **kwargs)
-            child.parent = tree
+        if cls._validates_by_type() and type(tree)._validates_by_type():
+            tree.add_children(cls.from_dict(child_d, **kwargs) for child_d in children)
+        else:
+            for child_d in children:
+                child = cls.from_dict(child_d, **kwargs)
+                child.parent = tree
 
         return tree
 
     fromdict = from_dict
 
+    @classmethod
+    def from_flat_dict(cls, d, sep=None, tree=None):
+        """Create a tree from a flat dictionary of {full_title: data}.
+
+        The full titles are grouped by parent first, so every parent adds all of its new children at once with
+        add_children instead of resolving the parents of each full title with add().
+
+        Args:
+            d (dict): Dictionary of {full_title: data}. Data of None creates a node without data (a parent node for
+                ParentNode trees). Full titles can also be tuples of titles.
+            sep (str)[None]: Delimiter of the full titles. None uses the tree's delimiter.
+            tree (TNode)[None]: Tree to add the nodes to. If None create a top level node. Nodes that already exist
+                in the tree are reused.
+
+        Returns:
+            tree (TNode): Tree that was created.
+        """
+        if tree is None:
+            tree = cls()
+        if sep is None:
+            sep = tree.get_delimiter()
+        root_title = tree.title
+
+        # Group the full titles into a trie of {title: [data, {children}]}
+        trie = {}
+        for full_title, data in d.items():
+            split = split_path(full_title, sep) if isinstance(full_title, str) else full_title
+            if root_title and split and split[0] == root_title:
+                split = split[1:]
+            level = trie
+            entry = None
+            for title in split:
+                entry = level.get(title, None)
+                if entry is None:
+                    entry = level[title] = [None, {}]
+                level = entry[1]
+            if entry is not None:
+                entry[0] = data
+
+        with tree.write_lock():
+            stack = [(tree, trie, True)]
+            while stack:
+                parent, level, existing = stack.pop()
+                new_children = []
+                for title, (data, sub) in level.items():
+                    node = find_title(parent, title) if existing else MISSING
+                    if node is MISSING:
+                        node = parent._new_child(title, is_parent=bool(sub) or data is None)
+                        new_children.append(node)
+                        found = False
+                    else:
+                        found = True
+                    if data is not None:
+                        node.set_data(data)
+                    if sub:
+                        stack.append((node, sub, found))
+                if new_children:
+                    parent.add_children(new_children)
+
+        return tree
+
+    def _new_child(self, title, is_parent=False):
+        """Create a node that will be added to this node by from_flat_dict.
+
+        is_parent is True for nodes that have children or no data.
+        """
+        return self.__class__(title)
+
     @classmethod
     def serialize(cls, value):
         """Convert a value to a string or bytes value that can be saved and loaded."""
+        import json
         try:
             return json.dumps(value)
         except (json.JSONDecodeError, Exception) as err:
@@ -457,6 +1547,7 @@ class TNode(object):
     @classmethod
     def deserialize(cls, value):
         """Convert a string or bytes value to a Python object."""
+        import json
         try:
             return json.loads(value)
         except (json.JSONDecodeError, Exception) as err:
@@ -491,14 +1582,43 @@ class TNode(object):
             new_err = error_cls(msg)  # Error class does not accept a string message argument
         except (TypeError, ValueError, Exception):
             new_err = ValueError(msg)
+
+        import traceback
         traceback.print_exception(error_cls, new_err, exc_tb)
 
     SAVE_EXT = {}
     LOAD_EXT = {}
+    ASYNC_SAVE_EXT = {}
+    ASYNC_LOAD_EXT = {}
+
+    # Built in file formats {ext: (saver method name, loader method name)}. They are registered the first time a file
+    # is saved or loaded, so importing tnode does not import json or configparser.
+    FORMATS = {'.json': ('to_json', 'from_json')}
 
     is_file_path = staticmethod(is_file_path)
     open_file = staticmethod(open_file)
 
+    @classmethod
+    def register_formats(cls):
+        """Register the built in FORMATS with the class that owns the SAVE_EXT and LOAD_EXT registry.
+
+        Extensions that are already registered are not replaced. save, load, save_async and load_async call this, so
+        it only needs to be called before reading SAVE_EXT or LOAD_EXT directly.
+        """
+        owner = next(c for c in cls.__mro__ if 'SAVE_EXT' in c.__dict__)
+        if owner.__dict__.get('_formats_registered', False):
+            return
+
+        with FORMATS_LOCK:
+            if owner.__dict__.get('_formats_registered', False):
+                return
+            for ext, (saver, loader) in owner.FORMATS.items():
+                if ext not in owner.SAVE_EXT:
+                    owner.register_saver(ext, getattr(owner, saver))
+                if ext not in owner.LOAD_EXT:
+                    owner.register_loader(ext, getattr(owner, loader))
+            owner._formats_registered = True
+
     @classmethod
     def register_saver(cls, ext, func=None):
         if not isinstance(ext, str):
@@ -527,6 +1647,36 @@ class TNode(object):
         cls.LOAD_EXT[str(ext).lower()] = func
         return func
 
+    @classmethod
+    def register_async_saver(cls, ext, func=None):
+        """Register a coroutine function func(node, filename, **kwargs) used by save_async for the extension."""
+        if not isinstance(ext, str):
+            raise TypeError('Invalid filename extension given to register!')
+
+        if func is None:
+            def decorator(func):
+                return cls.register_async_saver(ext, func)
+            return decorator
+
+        cls.ASYNC_SAVE_EXT[str(ext).lower()] = func
+        return func
+
+    @classmethod
+    def register_async_loader(cls, ext, func=None):
+        """Register a coroutine function func(cls_self, filename, **kwargs) used by load_async for the extension."""
+        if not isinstance(ext, str):
+            raise TypeError('Invalid filename extension given to register!')
+
+        if func is None:
+            def decorator(func):
+                return cls.register_async_loader(ext, func)
+            return decorator
+
+        if hasattr(func, '__func__'):
+            func = func.__func__
+        cls.ASYNC_LOAD_EXT[str(ext).lower()] = func
+        return func
+
     def save(self, filename, ext=None, **kwargs):
         """Save this tree to a file.
 
@@ -541,6 +1691,7 @@ class TNode(object):
             else:
                 raise TypeError('Missing "ext" argument when "filename" was not a path!')
 
+        self.register_formats()
         func = self.SAVE_EXT.get(ext.lower(), None)
         if callable(func):
             return func(self, filename, **kwargs)
@@ -566,6 +1717,7 @@ class TNode(object):
             else:
                 raise TypeError('Missing "ext" argument when "filename" was not a path!')
 
+        cls.register_formats()
         func = self.LOAD_EXT.get(ext.lower(), None)
         if callable(func):
             bound = func.__get__(self, cls)
@@ -573,7 +1725,82 @@ class TNode(object):
 
         raise ValueError('Invalid filename extension given!')
 
+    async def save_async(self, filename, ext=None, executor=None, chunk_size=None, **kwargs):
+        """Save this tree to a file without blocking the event loop.
+
+        If an async saver is registered for the extension it is used. Otherwise the registered saver encodes the tree
+        in the executor and the text is written one chunk at a time, yielding to the event loop between chunks.
+        Use set_threadsafe() if the tree can change while it is being encoded.
+
+        Args:
+            filename (str): Filename or opened file object to save this tree node to.
+            ext (str)[None]: File extension (Example: '.ini', '.json', ...). Must give if filename is file object.
+            executor (concurrent.futures.Executor)[None]: Executor for encoding and file I/O. None uses the loop
+                default.
+            chunk_size (int)[None]: Number of characters to write at a time.
+            **kwargs (object/dict): Save function keyword arguments.
+        """
+        from .async_utils import run_in_executor, write_chunks, encode, DEFAULT_CHUNK_SIZE
+
+        if ext is None:
+            if self.is_file_path(filename):
+                ext = os.path.splitext(str(filename))[-1]
+            else:
+                raise TypeError('Missing "ext" argument when "filename" was not a path!')
+
+        self.register_formats()
+        func = self.ASYNC_SAVE_EXT.get(ext.lower(), None)
+        if callable(func):
+            return await func(self, filename, **kwargs)
+
+        func = self.SAVE_EXT.get(ext.lower(), None)
+        if not callable(func):
+            raise ValueError('Invalid filename extension given!')
+
+        text = await run_in_executor(executor, encode, func, self, **kwargs)
+        return await write_chunks(filename, text, executor, chunk_size or DEFAULT_CHUNK_SIZE)
+
+    @dynamicmethod
+    async def load_async(self, filename, ext=None, executor=None, chunk_size=None, **kwargs):
+        """Load a tree from a file without blocking the event loop.
+
+        If an async loader is registered for the extension it is used. Otherwise the file is read one chunk at a
+        time and the registered loader decodes the text in the executor.
+
+        Args:
+            filename (str/TextIoWrapper): Filename or opened file object to read and load the tree from.
+            ext (str)[None]: File extension (Example: '.ini', '.json', ...). Must give if filename is file object.
+            executor (concurrent.futures.Executor)[None]: Executor for decoding and file I/O. None uses the loop
+                default.
+            chunk_size (int)[None]: Number of characters to read at a time.
+            **kwargs (object/dict): load function keyword arguments.
+        """
+        from .async_utils import run_in_executor, read_chunks, decode, DEFAULT_CHUNK_SIZE
+
+        cls = self
+        if isinstance(self, TNode):
+            cls = self.__class__
+
+        if ext is None:
+            if self.is_file_path(filename):
+                ext = os.path.splitext(str(filename))[-1]
+            else:
+                raise TypeError('Missing "ext" argument when "filename" was not a path!')
+
+        cls.register_formats()
+        func = self.ASYNC_LOAD_EXT.get(ext.lower(), None)
+        if callable(func):
+            return await func.__get__(self, cls)(filename, **kwargs)
+
+        func = self.LOAD_EXT.get(ext.lower(), None)
+        if not callable(func):
+            raise ValueError('Invalid filename extension given!')
+
+        text = await read_chunks(filename, executor, chunk_size or DEFAULT_CHUNK_SIZE)
+        return await run_in_executor(executor, decode, func.__get__(self, cls), text, **kwargs)
+
     def to_json(self, filename, **kwars):
+        import json
         d = self.to_dict()
 
         with self.open_file(filename, 'w') as file:
@@ -583,6 +1810,7 @@ class TNode(object):
 
     @dynamicmethod
     def from_json(self, filename, **kwargs):
+        import json
         with self.open_file(filename, 'r') as file:
             d = json.load(file)
 
@@ -592,5 +1820,6 @@ class TNode(object):
         return self.from_dict(d, **kwargs)
 
 
-TNode.register_saver('.json', TNode.to_json)
-TNode.register_loader('.json', TNode.from_json)
+# Validators that only depend on the types of the parent and child. parent_child adds the ParentNode and ChildNode
+# validators.
+TYPE_VALIDATORS = {TNode.validate_parent, TNode.validate_child}
@@ -0,0 +1,127 @@
+import threading
+
+from .interface import TNode
+from . import sorting
+
+
+__all__ = ['LazyNode']
+
+
+# Serializes loading, so two threads that touch the same node do not both run its loader.
+LOAD_LOCK = threading.RLock()
+
+
+class LazyNode(TNode):
+    """TNode whose children are created by a loader the first time they are used.
+
+    Anything that uses the children (iter_children, __getitem__, find, len, add_child, ...) runs the loader first.
+    LazyNode.from_dict, from_json and load only create the top node and create the children of each node on demand,
+    so the cost of building the tree is proportional to the part of the tree that is used.
+
+    Args:
+        title (str)['']: Title of this node.
+        loader (callable)[None]: Function that takes this node and returns an iterable of child nodes. This can
+            read the children from any source (Example: offsets into a large file).
+    """
+    def __init__(self, title='', *child, loader=None, **kwargs):
+        super(LazyNode, self).__init__(title, *child, **kwargs)
+        self.set_loader(loader)
+
+    def set_loader(self, loader):
+        """Set the function that creates the children the next time the children are used."""
+        self.__dict__['_loader'] = loader
+
+    def is_loaded(self):
+        """Return if the loader has already created the children."""
+        return self.__dict__.get('_loader', None) is None
+
+    def _load(self):
+        with LOAD_LOCK:
+            # The loader is only cleared after the children are attached, so other threads that see a loader wait on
+            # the lock and never see a partly loaded node. The loading thread itself sees the old child list.
+            loader = self.__dict__.get('_loader', None)
+            if loader is None or self.__dict__.get('_loading', False):
+                return
+            self.__dict__['_loading'] = True
+            try:
+                loaded = list(loader(self))
+                validated = set()
+                for child in loaded:
+                    if type(child) not in validated:
+                        self.validate_child(child)
+                        if isinstance(child, TNode):
+                            child.validate_parent(self)
+                        validated.add(type(child))
+
+                # Attach directly. Loading is not a change, so this does not lock, notify or invalidate anything.
+                for child in loaded:
+                    if isinstance(child, TNode):
+                        child._detach()
+                        child._parent = self
+                children = self.__dict__['_child_list'] + loaded
+                if self.SORT_KEY is not None:
+                    children.sort(key=sorting.get_key_func(self.SORT_KEY))
+
+                self.__dict__['_child_list'] = children
+                self.__dict__['_loader'] = None
+            finally:
+                self.__dict__.pop('_loading', None)
+
+    @property
+    def _children(self):
+        if self.__dict__.get('_loader', None) is not None:
+            self._load()
+        return self.__dict__['_child_list']
+
+    @_children.setter
+    def _children(self, value):
+        self.__dict__['_child_list'] = value
+
+    def _take_children(self):
+        """Remove and return the children that were loaded. Children that were never loaded are not created."""
+        with LOAD_LOCK:
+            self.__dict__['_loader'] = None
+            children, self.__dict__['_child_list'] = self.__dict__['_child_list'], []
+        return children
+
+    def __getstate__(self):
+        self._load()
+        state = super(LazyNode, self).__getstate__()
+        state.pop('_child_list', None)
+        state.pop('_loader', None)
+        return state
+
+    @classmethod
+    def from_dict(cls, d, tree=None, **kwargs):
+        """Create a tree from the given dictionary without creating the children until they are used.
+
+        Args:
+            d (dict): Dictionary of tree items.
+                Example: {'title': title, 'data': data if data, 'children': [{'title': title, 'data': data}]}
+            tree (TNode)[None]: Parent tree node to add items to. If None create a top level parent.
+
+        Returns:
+            tree (LazyNode): Tree (LazyNode) object that was created.
+        """
+        children = d.pop('children', [])
+        if tree is None:
+            tree = cls()
+
+        # Set all d items as attributes
+        for attr, val in d.items():
+            try:
+                setattr(tree, attr, val)
+            except (AttributeError, TypeError, Exception):
+                pass
+
+        if children:
+            def loader(node):
+                return [cls.from_dict(child_d, **kwargs) for child_d in children]
+
+            if not tree.is_loaded():
+                tree._load()
+            tree.set_loader(loader)
+
+        return tree
+
+    fromdict = from_dict
@@ -0,0 +1,154 @@
+import threading
+
+
+__all__ = ['RWLock', 'NULL_LOCK']
+
+
+class LockContext(object):
+    """Context manager that calls the given acquire and release functions."""
+    __slots__ = ('acquire', 'release')
+
+    def __init__(self, acquire, release):
+        self.acquire = acquire
+        self.release = release
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
+        return False
+
+
+class NullLock(object):
+    """Context manager that does nothing. Used when a tree is not thread safe."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+
+NULL_LOCK = NullLock()
+
+
+class RWLock(object):
+    """Reentrant reader/writer lock.
+
+    Any number of threads can hold the read lock at the same time while the write lock is exclusive. A thread that
+    holds the write lock can also acquire the read lock. Waiting writers block new readers, so writers do not starve.
+
+    Example:
+
+        .. code-block:: python
+
+            lock = RWLock()
+            with lock.read:
+                ...
+            with lock.write:
+                ...
+    """
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = {}  # {thread ident: count}
+        self._writer = None
+        self._write_count = 0
+        self._waiting_writers = 0
+
+        self.read = LockContext(self.acquire_read, self.release_read)
+        self.write = LockContext(self.acquire_write, self.release_write)
+
+    def acquire_read(self):
+        """Acquire the shared read lock."""
+        me = threading.get_ident()
+        with self._cond:
+            if self._writer == me or me in self._readers:
+                # Reentrant. Do not wait for waiting writers or this thread would deadlock itself.
+                self._readers[me] = self._readers.get(me, 0) + 1
+                return
+
+            while self._writer is not None or self._waiting_writers:
+                self._cond.wait()
+            self._readers[me] = 1
+
+    def release_read(self):
+        """Release the shared read lock."""
+        me = threading.get_ident()
+        with self._cond:
+            try:
+                count = self._readers[me] - 1
+            except KeyError:
+                raise RuntimeError('Cannot release an un-acquired read lock!') from None
+
+            if count > 0:
+                self._readers[me] = count
+            else:
+                del self._readers[me]
+                if not self._readers:
+                    self._cond.notify_all()
+
+    def acquire_write(self):
+        """Acquire the exclusive write lock."""
+        me = threading.get_ident()
+        with self._cond:
+            if self._writer == me:
+                self._write_count += 1
+                return
+            elif me in self._readers:
+                raise RuntimeError('Cannot upgrade a read lock to a write lock!')
+
+            self._waiting_writers += 1
+            try:
+                while self._writer is not None or self._readers:
+                    self._cond.wait()
+            finally:
+                self._waiting_writers -= 1
+            self._writer = me
+            self._write_count = 1
+
+    def release_write(self):
+        """Release the exclusive write lock."""
+        with self._cond:
+            if self._writer != threading.get_ident():
+                raise RuntimeError('Cannot release an un-acquired write lock!')
+
+            self._write_count -= 1
+            if self._write_count == 0:
+                self._writer = None
+                self._cond.notify_all()
+
+
+class MultiWriteLock(object):
+    """Context manager to acquire the write lock of several trees in a consistent order to avoid deadlocks.
+
+    Args:
+        get_locks (callable): Function that returns the list of locks to acquire. This is checked again after the
+            locks are acquired, because the nodes could have moved to a different tree while waiting.
+    """
+    __slots__ = ('get_locks', 'locks')
+
+    def __init__(self, get_locks):
+        self.get_locks = get_locks
+        self.locks = []
+
+    def __enter__(self):
+        while True:
+            locks = sorted(set(self.get_locks()), key=id)
+            for lock in locks:
+                lock.acquire_write()
+
+            if sorted(set(self.get_locks()), key=id) == locks:
+                self.locks = locks
+                return self
+
+            for lock in reversed(locks):
+                lock.release_write()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        for lock in reversed(self.locks):
+            lock.release_write()
+        self.locks = []
+        return False
@@ -0,0 +1,83 @@
+import threading
+import weakref
+from collections import namedtuple
+
+
+__all__ = ['TEvent', 'CHILD_ADDED', 'CHILD_REMOVED', 'DATA', 'TITLE', 'batch', 'is_batching', 'deliver',
+           'SUBSCRIBED', 'track', 'untrack']
+
+
+CHILD_ADDED = 'child_added'
+CHILD_REMOVED = 'child_removed'
+DATA = 'data'
+TITLE = 'title'
+
+
+TEvent = namedtuple('TEvent', ['kind', 'node', 'value'])
+TEvent.__doc__ = """Change event delivered to observers.
+
+Args:
+    kind (str): 'child_added', 'child_removed', 'data' or 'title'.
+    node (TNode): Node that changed. For child events this is the parent.
+    value (object): The child that was added or removed, the new data, or the old title.
+"""
+
+
+_local = threading.local()
+
+
+class batch(object):
+    """Context manager that collects the events of this thread and delivers them when the outermost batch exits.
+
+    Each callback is called once with the list of all of its events instead of once per event.
+    """
+    def __enter__(self):
+        depth = getattr(_local, 'depth', 0)
+        if depth == 0:
+            _local.pending = {}
+        _local.depth = depth + 1
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        _local.depth -= 1
+        if _local.depth == 0:
+            pending, _local.pending = _local.pending, {}
+            for callback, events in pending.items():
+                callback(events)
+        return False
+
+
+def is_batching():
+    """Return if this thread is collecting events in a batch."""
+    return getattr(_local, 'depth', 0) > 0
+
+
+def deliver(callback, event):
+    """Call the callback with the event now or add it to the current batch."""
+    if getattr(_local, 'depth', 0) > 0:
+        _local.pending.setdefault(callback, []).append(event)
+    else:
+        callback([event])
+
+
+# Weak references to the nodes that have observers by id(node). Trees without observers only check if this is empty.
+# Nodes are removed when they unsubscribe their last observer, are destroyed or are garbage collected.
+SUBSCRIBED = {}
+
+
+def track(node):
+    """Remember that the node has observers until it is untracked or garbage collected."""
+    key = id(node)
+    if key not in SUBSCRIBED:
+        def forget(ref, key=key):
+            if SUBSCRIBED.get(key) is ref:
+                del SUBSCRIBED[key]
+
+        SUBSCRIBED[key] = weakref.ref(node, forget)
+
+
+def untrack(node):
+    """Forget that the node has observers."""
+    ref = SUBSCRIBED.get(id(node))
+    if ref is not None and ref() is node:
+        del SUBSCRIBED[id(node)]
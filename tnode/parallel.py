@@ -0,0 +1,170 @@
+import os
+import functools
+from concurrent.futures import ProcessPoolExecutor
+
+from .interface import MISSING
+
+
+__all__ = ['split_leaves', 'parallel_map', 'parallel_reduce']
+
+
+def has_data(node):
+    """Return if the node has data. Children that are not nodes do not have data."""
+    try:
+        return node.has_data()
+    except AttributeError:
+        return False
+
+
+def map_values(func, values):
+    """Worker function to map a chunk of data values."""
+    return [func(value) for value in values]
+
+
+def reduce_values(func, reduce_func, values):
+    """Worker function to map and reduce a chunk of data values."""
+    return functools.reduce(reduce_func, map(func, values))
+
+
+def count_leaves(node):
+    """Return a dictionary of {id(node): number of nodes with data in the subtree} for the node and its children."""
+    counts = {}
+    stack = [(node, False)]
+    while stack:
+        n, visited = stack.pop()
+        children = getattr(n, 'children', [])
+        if visited:
+            counts[id(n)] = int(has_data(n)) + sum(counts[id(ch)] for ch in children)
+        else:
+            stack.append((n, True))
+            stack.extend((ch, False) for ch in children)
+    return counts
+
+
+def split_leaves(node, chunk='subtree', workers=None):
+    """Split the nodes with data below the given node into chunks. The given node itself is not included.
+
+    Args:
+        node (TNode): Tree to split.
+        chunk (str/int)['subtree']: If 'subtree' group whole subtrees into balanced chunks of about
+            leaves / (workers * 4) nodes. If an int use chunks of this many nodes in iteration order.
+        workers (int)[None]: Number of workers used to balance the subtree chunks. Defaults to os.cpu_count().
+
+    Returns:
+        chunks (list): List of lists of nodes with data.
+    """
+    if isinstance(chunk, int):
+        if chunk < 1:
+            raise ValueError('Invalid chunk given! An int chunk size must be 1 or greater.')
+        leaves = [n for n in node.iter() if has_data(n)]
+        return [leaves[i: i+chunk] for i in range(0, len(leaves), chunk)]
+    elif chunk != 'subtree':
+        raise ValueError('Invalid chunk given! This must be "subtree" or an int.')
+
+    counts = count_leaves(node)
+    leaves = counts[id(node)] - int(has_data(node))
+    target = max(1, -(-leaves // ((workers or os.cpu_count() or 1) * 4)))
+
+    chunks = []
+    current = []
+
+    def add_subtree(subtree):
+        current.extend(n for n in subtree.iter() if has_data(n))
+
+    # Take whole subtrees that fit in the target size, otherwise split the subtree into its children.
+    stack = [iter(node.children)]
+    while stack:
+        for child in stack[-1]:
+            size = counts[id(child)]
+            if size == 0:
+                continue
+            elif size <= target or len(child) == 0:
+                if has_data(child):
+                    current.append(child)
+                add_subtree(child)
+                if len(current) >= target:
+                    chunks.append(current)
+                    current = []
+            else:
+                if has_data(child):
+                    current.append(child)
+                stack.append(iter(child.children))
+                break
+        else:
+            stack.pop()
+
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def get_workers(executor):
+    return getattr(executor, '_max_workers', None) or os.cpu_count()
+
+
+def parallel_map(node, func, executor=None, chunk='subtree'):
+    """Run func on the data of every node below the given node in a process pool and set the results as the data.
+
+    Only the data values of each chunk are sent to the workers, not the nodes.
+
+    Args:
+        node (TNode): Tree to map.
+        func (callable): Picklable function that takes a data value and returns the new data value.
+        executor (concurrent.futures.Executor)[None]: Executor to use. If None a ProcessPoolExecutor is created.
+        chunk (str/int)['subtree']: How to split the tree. See split_leaves.
+
+    Returns:
+        node (TNode): The given node.
+    """
+    own_executor = executor is None
+    if own_executor:
+        executor = ProcessPoolExecutor()
+
+    try:
+        chunks = split_leaves(node, chunk, get_workers(executor))
+        futures = [executor.submit(map_values, func, [n.get_data() for n in nodes]) for nodes in chunks]
+        for nodes, fut in zip(chunks, futures):
+            for n, value in zip(nodes, fut.result()):
+                n.set_data(value)
+    finally:
+        if own_executor:
+            executor.shutdown()
+
+    return node
+
+
+def parallel_reduce(node, func, reduce_func, initial=MISSING, executor=None, chunk='subtree'):
+    """Map the data of every node below the given node and reduce the results in a process pool.
+
+    Each chunk is reduced in a worker and the chunk results are reduced in iteration order, so reduce_func should be
+    associative.
+
+    Args:
+        node (TNode): Tree to reduce.
+        func (callable): Picklable function that takes a data value and returns the value to reduce.
+        reduce_func (callable): Picklable function that takes two values and returns one value.
+        initial (object)[MISSING]: Initial value for the reduction.
+        executor (concurrent.futures.Executor)[None]: Executor to use. If None a ProcessPoolExecutor is created.
+        chunk (str/int)['subtree']: How to split the tree. See split_leaves.
+
+    Returns:
+        value (object): The reduced value.
+    """
+    own_executor = executor is None
+    if own_executor:
+        executor = ProcessPoolExecutor()
+
+    try:
+        chunks = split_leaves(node, chunk, get_workers(executor))
+        futures = [executor.submit(reduce_values, func, reduce_func, [n.get_data() for n in nodes])
+                   for nodes in chunks]
+        results = [fut.result() for fut in futures]
+    finally:
+        if own_executor:
+            executor.shutdown()
+
+    if initial is not MISSING:
+        return functools.reduce(reduce_func, results, initial)
+    elif not results:
+        raise TypeError('parallel_reduce() of a tree without data and no initial value')
+    return functools.reduce(reduce_func, results)
@@ -1,53 +1,108 @@
-import configparser
 from dynamicmethod import dynamicmethod
 from collections import OrderedDict
-from .interface import TNode
-
-try:
-    from dataclasses import MISSING
-except (ImportError, Exception):
-    class MISSING(object):
-        pass
+from .paths import escape_title, split_path
+from .interface import TNode, MISSING, TYPE_VALIDATORS, find_title
 
 
 __all__ = ['ParentNode', 'ChildNode']
 
 
+def load_file(cls, filename, ext=None, kwargs=None):
+    """Worker function to load a tree from a file."""
+    return cls.load(filename, ext=ext, **(kwargs or {}))
+
+
 class ParentChildRegistration:
     PARENT_TYPES = []
     CHILD_TYPES = []
 
+    # Bumped whenever any registration changes. Subclasses can share the same type lists, so a global counter is the
+    # simplest way to invalidate every class's accepted type cache.
+    _TYPES_VERSION = 0
+
+    @classmethod
+    def _types_changed(cls):
+        ParentChildRegistration._TYPES_VERSION += 1
+
+    @classmethod
+    def _get_type_cache(cls, name):
+        """Return this class's {concrete type: accepted} cache for the given name ('parent' or 'child')."""
+        attr = '_{}_TYPE_CACHE'.format(name.upper())
+        cache = cls.__dict__.get(attr, None)  # Do not use an inherited cache
+        if cache is None or cache[0] != ParentChildRegistration._TYPES_VERSION:
+            cache = (ParentChildRegistration._TYPES_VERSION, {})
+            setattr(cls, attr, cache)
+        return cache[1]
+
+    @classmethod
+    def get_parent_types(cls):
+        """Return the registered parent types."""
+        return cls.PARENT_TYPES
+
+    @classmethod
+    def get_child_types(cls):
+        """Return the registered child types."""
+        return cls.CHILD_TYPES
+
+    @classmethod
+    def is_parent_type(cls, parent_type):
+        """Return if instances of the given concrete type are allowed to be a parent. The result is cached."""
+        cache = cls._get_type_cache('parent')
+        try:
+            return cache[parent_type]
+        except KeyError:
+            accepted = cache[parent_type] = issubclass(parent_type, tuple(cls.get_parent_types()))
+            return accepted
+
+    @classmethod
+    def is_child_type(cls, child_type):
+        """Return if instances of the given concrete type are allowed to be a child. The result is cached."""
+        cache = cls._get_type_cache('child')
+        try:
+            return cache[child_type]
+        except KeyError:
+            accepted = cache[child_type] = issubclass(child_type, tuple(cls.get_child_types()))
+            return accepted
+
     @classmethod
     def register_parent_type(cls, parent_cls):
-        cls.PARENT_TYPES.append(parent_cls)
+        if parent_cls not in cls.PARENT_TYPES:
+            cls.PARENT_TYPES.append(parent_cls)
+            cls._types_changed()
         return parent_cls
 
     @classmethod
     def remove_parent_type(cls, parent_cls):
         try:
             cls.PARENT_TYPES.remove(parent_cls)
+            cls._types_changed()
         except(TypeError, ValueError, Exception):
             pass
 
     @classmethod
     def clear_parent_types(cls):
-        cls.CHILD_TYPES.clear()
+        cls.PARENT_TYPES.clear()
+        cls._types_changed()
 
     @classmethod
     def register_child_type(cls, child_cls):
-        cls.CHILD_TYPES.append(child_cls)
+        if child_cls not in cls.CHILD_TYPES:
+            cls.CHILD_TYPES.append(child_cls)
+            cls._types_changed()
         return child_cls
 
     @classmethod
     def remove_child_type(cls, child_cls):
         try:
             cls.CHILD_TYPES.remove(child_cls)
+            cls._types_changed()
         except(TypeError, ValueError, Exception):
             pass
 
     @classmethod
     def clear_child_types(cls):
         cls.CHILD_TYPES.clear()
+        cls._types_changed()
 
 
 class ParentNode(TNode, ParentChildRegistration):
@@ -55,26 +110,32 @@ class ParentNode(TNode, ParentChildRegistration):
     CHILD_TYPES = []
     SAVE_EXT = {}
     LOAD_EXT = {}
+    ASYNC_SAVE_EXT = {}
+    ASYNC_LOAD_EXT = {}
+    FORMATS = {'.json': ('to_json', 'from_json'), '.ini': ('to_ini', 'from_ini'), '.conf': ('to_ini', 'from_ini')}
+    CACHE_DERIVED = True  # Parents never have data, so cached snapshots and digests stay valid
 
     def __init__(self, title='', *child, children=None, parent=None, **kwargs):
         super(ParentNode, self).__init__(title, *child, children=children, parent=parent, **kwargs)
 
+    @classmethod
+    def get_parent_types(cls):
+        """Return the registered parent types. If no parent types are registered this class is the parent type."""
+        return cls.PARENT_TYPES or [cls]
+
     def validate_parent(self, parent):
-        parent_types = [p for p in self.PARENT_TYPES]
-        if len(parent_types) == 0:
-            parent_types.append(type(self))
-        if parent is not None and not any(isinstance(parent, ptype) for ptype in parent_types):
+        if parent is not None and not self.is_parent_type(type(parent)):
             raise TypeError('Invalid parent node type "{}"!'.format(type(parent).__name__))
 
     def validate_child(self, child):
-        if not any(isinstance(child, chtype) for chtype in self.CHILD_TYPES):
+        if not self.is_child_type(type(child)):
             raise TypeError('Invalid child node type "{}"!'.format(type(child).__name__))
 
     def add(self, full_title, obj=None, *_, child_type=None, create_missing=False, **kwargs):
         """Add a child node to this parent or sub parent.
 
         Args:
-            full_title (str): Full title path to add this parent object to.
+            full_title (str/TPath/tuple): Full title path or pre-split titles to add this object to.
             obj (object)[None]: Child Type object to add.
             child_type (type/class): Child type that should be used to create the child object. CHILD_TYPES[0]
             create_missing (bool)[False]: If True create the missing parents else raise an error if a parent is missing.
@@ -85,7 +146,7 @@ class ParentNode(TNode, ParentChildRegistration):
         if obj is not None:
             if obj.title != title:
                 obj.title = title
-            if obj not in parent:
+            if find_title(parent, title) is MISSING:
                 parent.add_child(obj)
         else:
             if child_type is None:
@@ -94,10 +155,9 @@ class ParentNode(TNode, ParentChildRegistration):
                 except IndexError:
                     raise TypeError('No child types set!')
 
-            # Get or create the child
-            try:
-                obj = parent[title]
-            except KeyError:
+            # Get or create the child. The title is not a full title, so only the direct children are searched
+            obj = find_title(parent, title)
+            if obj is MISSING:
                 obj = child_type(title=title)
                 parent.add_child(obj)
 
@@ -108,7 +168,7 @@ class ParentNode(TNode, ParentChildRegistration):
         """Add a parent node to this parent or a sub parent.
 
         Args:
-            full_title (str): Full title path to add this parent object to.
+            full_title (str/TPath/tuple): Full title path or pre-split titles to add this object to.
             obj (object)[None]: Parent Type object to add.
             parent_type (type/class): Parent type that should be used to create the parent object. PARENT_TYPES[0]
             create_missing (bool)[False]: If True create the missing parents else raise an error if a parent is missing.
@@ -120,7 +180,7 @@ class ParentNode(TNode, ParentChildRegistration):
             # Add the obj
             if obj.title != title:
                 obj.title = title
-            if obj not in parent:
+            if find_title(parent, title) is MISSING:
                 parent.add_child(obj)
         else:
             if parent_type is None:
@@ -129,16 +189,32 @@ class ParentNode(TNode, ParentChildRegistration):
                 except IndexError:
                     parent_type = type(parent)
 
-            # Get or create the child
-            try:
-                obj = parent[title]
-            except KeyError:
+            # Get or create the child. The title is not a full title, so only the direct children are searched
+            obj = find_title(parent, title)
+            if obj is MISSING:
                 obj = parent_type(title=title)
                 parent.add_child(obj)
 
         obj.update(kwargs)
         return obj
 
+    def _new_child(self, title, is_parent=False):
+        """Create a node of this parent's first parent or child type for from_flat_dict.
+
+        Nodes with children or without data use the parent type, so empty parents keep their type.
+        """
+        if is_parent:
+            try:
+                node_type = self.PARENT_TYPES[0]
+            except IndexError:
+                node_type = type(self)
+        else:
+            try:
+                node_type = self.CHILD_TYPES[0]
+            except IndexError:
+                raise TypeError('No child types set!')
+        return node_type(title=title)
+
     def has_data(self):
         """Helper to return if this function has data."""
         return False
@@ -179,17 +255,52 @@ class ParentNode(TNode, ParentChildRegistration):
                 pass
 
         for child_d in children:
+            # Titles are given as paths that start with the tree's title, so they are never split on the delimiter
+            path = (tree.title, child_d.pop('title', ''))
             if 'data' not in child_d:
-                p = tree.add_parent(child_d.pop('title', ''), create_missing=True)
+                p = tree.add_parent(path, create_missing=True)
                 p.from_dict(child_d, tree=p, **kwargs)
             else:
-                c = tree.add(child_d.pop('title', ''), create_missing=True)
+                c = tree.add(path, create_missing=True)
                 c.from_dict(child_d, tree=c, **kwargs)
 
         return tree
 
     fromdict = from_dict
 
+    @dynamicmethod
+    def load_many(self, filenames, max_workers=None, use_processes=False, conflict='replace', ext=None, **kwargs):
+        """Load several files in parallel and merge them into one tree.
+
+        Files are parsed in a thread pool (or process pool) and merged in the order that they were given, so the result
+        does not depend on which file finished loading first.
+
+        Args:
+            filenames (list): Filenames to load.
+            max_workers (int)[None]: Maximum number of workers.
+            use_processes (bool)[False]: If True parse the files in a ProcessPoolExecutor instead of threads.
+            conflict (str)['replace']: How to handle duplicate full_titles. See TNode.merge.
+            ext (str)[None]: File extension to use for all of the files. If None use each filename's extension.
+            **kwargs (object/dict): load function keyword arguments.
+
+        Returns:
+            tree (ParentNode): This node or a new tree if called as a class method.
+        """
+        from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+        if isinstance(self, TNode):
+            cls, tree = self.__class__, self
+        else:
+            cls, tree = self, self()
+
+        executor_type = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+        with executor_type(max_workers=max_workers) as executor:
+            futures = [executor.submit(load_file, cls, filename, ext, kwargs) for filename in filenames]
+            for fut in futures:
+                tree.merge(fut.result(), conflict=conflict)
+
+        return tree
+
     def to_ini_dict(self, d, parent_key='', delimiter=None, tree=None, include_empty_parents=True, **kwargs):
         """Convert a nested dictionary of {'title': title, 'data': data, 'children': [{'title': title, 'data': data}]}
         to an simple init dict {'section': {'title': value, 'title2': value}, 'sub section': {'title': value}}
@@ -209,9 +320,10 @@ class ParentNode(TNode, ParentChildRegistration):
         if delimiter is None:
             delimiter = self.get_delimiter()
 
-        key = title = d.pop('title', '')
+        title = d.pop('title', '')
+        key = escape_title(title, delimiter)  # Titles that contain the delimiter are escaped in the section names
         if parent_key:
-            key = parent_key + delimiter + title
+            key = parent_key + delimiter + key
 
         children = d.pop('children', [])
         data = d.pop('data', MISSING)
@@ -230,9 +342,18 @@ class ParentNode(TNode, ParentChildRegistration):
         return tree
 
     @classmethod
-    def from_ini_dict(cls, d):
-        """Convert an ini dict to the standard dict format."""
+    def from_ini_dict(cls, d, delimiter=None):
+        """Convert an ini dict to the standard dict format.
+
+        Args:
+            d (OrderedDict/dict): Ini dict {'section': {'title': value}, 'section > sub section': {'title': value}}
+            delimiter (str)[None]: Parent key separator. Section names are split with split_path, so escaped
+                delimiters stay in the titles.
+        """
+        if delimiter is None:
+            delimiter = cls.get_delimiter()
         tree = OrderedDict([('title', ''), ('children', [])])
+        sections = {(): tree}
 
         # If default ('') add children to top level
         if '' in d:
@@ -240,10 +361,14 @@ class ParentNode(TNode, ParentChildRegistration):
             for title, value in section.items():
                 tree['children'].append(OrderedDict([('title', title), ('data', value)]))
 
-        # Add subsections
+        # Add subsections and any parent sections that were not saved
         for name, section in d.items():
-            sect = OrderedDict([('title', name), ('children', [])])
-            tree['children'].append(sect)
+            path = tuple(split_path(name, delimiter))
+            for i in range(1, len(path) + 1):
+                sect = sections.get(path[:i], None)
+                if sect is None:
+                    sect = sections[path[:i]] = OrderedDict([('title', path[i - 1]), ('children', [])])
+                    sections[path[:i - 1]]['children'].append(sect)
 
             for title, value in section.items():
                 sect['children'].append(OrderedDict([('title', title), ('data', value)]))
@@ -251,6 +376,7 @@ class ParentNode(TNode, ParentChildRegistration):
         return tree
 
     def to_ini(self, filename, include_empty_parents=True, **kwargs):
+        import configparser
         cfg = configparser.ConfigParser(allow_no_value=True, strict=False, inline_comment_prefixes=(";"))
         cfg.optionxform = str  # Make option names case-sensitive
 
@@ -274,6 +400,7 @@ class ParentNode(TNode, ParentChildRegistration):
 
     @dynamicmethod
     def from_ini(cls, filename, **kwargs):
+        import configparser
         cfg = configparser.ConfigParser(allow_no_value=True, strict=False, inline_comment_prefixes=(";"))
         cfg.optionxform = str  # Make option names case-sensitive
 
@@ -300,16 +427,7 @@ class ParentNode(TNode, ParentChildRegistration):
         kwds = {}
         if isinstance(cls, TNode):
             kwds['tree'] = cls
-        return cls.from_dict(cls.from_ini_dict(d), **kwds)
-
-
-# Register save/load for this class
-ParentNode.register_saver('.json', ParentNode.to_json)
-ParentNode.register_loader('.json', ParentNode.from_json)
-ParentNode.register_saver('.ini', ParentNode.to_ini)
-ParentNode.register_loader('.ini', ParentNode.from_ini)
-ParentNode.register_saver('.conf', ParentNode.to_ini)
-ParentNode.register_loader('.conf', ParentNode.from_ini)
+        return cls.from_dict(cls.from_ini_dict(d, cls.get_delimiter()), **kwds)
 
 
 class ChildNode(TNode, ParentChildRegistration):
@@ -317,12 +435,15 @@ class ChildNode(TNode, ParentChildRegistration):
     CHILD_TYPES = []
     SAVE_EXT = {}
     LOAD_EXT = {}
+    ASYNC_SAVE_EXT = {}
+    ASYNC_LOAD_EXT = {}
+    FORMATS = ParentNode.FORMATS
 
     def __init__(self, title='', parent=None, data=None, **kwargs):
         super(ChildNode, self).__init__(title, parent=parent, data=data, **kwargs)
 
     def validate_parent(self, parent):
-        if parent is not None and not any(isinstance(parent, ptype) for ptype in self.PARENT_TYPES):
+        if parent is not None and not self.is_parent_type(type(parent)):
             raise TypeError('Invalid parent node type "{}"!'.format(type(parent).__name__))
 
     def validate_child(self, child):
@@ -334,10 +455,5 @@ class ChildNode(TNode, ParentChildRegistration):
     from_ini = ParentNode.from_ini
 
 
-# Register save/load for this class
-ChildNode.register_saver('.json', ChildNode.to_json)
-ChildNode.register_loader('.json', ChildNode.from_json)
-ChildNode.register_saver('.ini', ChildNode.to_ini)
-ChildNode.register_loader('.ini', ChildNode.from_ini)
-ChildNode.register_saver('.conf', ChildNode.to_ini)
-ChildNode.register_loader('.conf', ChildNode.from_ini)
+TYPE_VALIDATORS.update((ParentNode.validate_parent, ParentNode.validate_child,
+                        ChildNode.validate_parent, ChildNode.validate_child))
@@ -0,0 +1,157 @@
+import copy
+
+from .interface import MISSING, find_title
+from .diff import ADDED, REMOVED, MOVED, DATA, RENAMED
+
+
+__all__ = ['make_patch', 'apply_patch']
+
+
+# Operations are ordered so that every path can be resolved when the operation runs. Nodes that are reported by diff
+# below a common parent keep the same full_title in both trees, and added, moved and renamed titles never collide with
+# titles that are still in the old tree.
+OP_ORDER = {DATA: 0, REMOVED: 1, MOVED: 2, RENAMED: 3, ADDED: 4}
+
+
+def make_patch(old, new):
+    """Return a list of operations that turns the old tree into the new tree.
+
+    The patch is a list of dictionaries that can be saved with json (if the data can be saved with json) or pickle.
+
+        * {'op': 'set_data', 'path': full_title, 'data': data}
+        * {'op': 'remove', 'path': full_title}
+        * {'op': 'move', 'path': full_title, 'to': new parent full_title}
+        * {'op': 'rename', 'path': full_title, 'title': new title}
+        * {'op': 'add', 'path': full_title, 'node': node.to_dict()}
+    """
+    patch = []
+    changes = sorted(old.diff(new), key=lambda c: OP_ORDER[c.kind])
+    for change in changes:
+        if change.kind == DATA:
+            patch.append({'op': 'set_data', 'path': change.full_title, 'data': change.new.get_data()})
+        elif change.kind == REMOVED:
+            patch.append({'op': 'remove', 'path': change.full_title})
+        elif change.kind == MOVED:
+            patch.append({'op': 'move', 'path': change.old.full_title, 'to': change.new.parent.full_title})
+        elif change.kind == RENAMED:
+            patch.append({'op': 'rename', 'path': change.old.full_title, 'title': change.new.title})
+        elif change.kind == ADDED:
+            patch.append({'op': 'add', 'path': change.full_title, 'node': change.new.to_dict()})
+    return patch
+
+
+class PathCache(object):
+    """Resolve full titles of a tree once and forget the paths below a node that moved or was removed."""
+    def __init__(self, tree):
+        self.tree = tree
+        self.delim = tree.get_delimiter()
+        self.nodes = {}
+
+    def resolve(self, path):
+        try:
+            return self.nodes[path]
+        except KeyError:
+            if path == self.tree.full_title:
+                node = self.tree
+            else:
+                node = self.tree.find(path)
+            self.nodes[path] = node
+            return node
+
+    def resolve_parent(self, path):
+        parent, title = self.tree.find_parent(path)
+        return parent, title
+
+    def forget(self, path):
+        prefix = path + self.delim
+        for key in [k for k in self.nodes if k == path or k.startswith(prefix)]:
+            del self.nodes[key]
+
+
+def reinsert(parent, node, index):
+    """Add the node back to the parent at the given index."""
+    parent.insert_child(index, node)
+
+
+def create_node(parent, node_dict):
+    """Create a node from a to_dict() dictionary the same way that the parent's from_dict would."""
+    holder = parent.__class__()
+    parent.__class__.from_dict({'title': '', 'children': [copy.deepcopy(node_dict)]}, tree=holder)
+    node = holder.children[0]
+    node._detach()
+    return node
+
+
+def apply_patch(tree, patch):
+    """Apply a patch created by make_patch to the tree.
+
+    Paths are resolved once and the operations are applied as a batch while holding the tree's write lock. Each
+    operation is validated before it changes the tree. If any operation fails every operation that was already
+    applied is undone and the error is raised.
+
+    Returns:
+        tree (TNode): The given tree.
+    """
+    undo = []
+    paths = PathCache(tree)
+
+    with tree.write_lock():
+        try:
+            for op in patch:
+                kind = op['op']
+                path = op['path']
+
+                if kind == 'set_data':
+                    node = paths.resolve(path)
+                    had_data, old_data = node.has_data(), node.get_data()
+                    node.set_data(op['data'])
+                    undo.append(lambda n=node, d=old_data, h=had_data: n.set_data(d if h else None))
+
+                elif kind == 'remove':
+                    node = paths.resolve(path)
+                    parent = node.parent
+                    index = parent.child_index(node)
+                    parent.remove_child(node)
+                    paths.forget(path)
+                    undo.append(lambda p=parent, n=node, i=index: reinsert(p, n, i))
+
+                elif kind == 'move':
+                    node = paths.resolve(path)
+                    new_parent = paths.resolve(op['to'])
+                    new_parent.validate_child(node)
+                    node.validate_parent(new_parent)
+
+                    parent = node.parent
+                    index = parent.child_index(node)
+                    node.parent = new_parent
+                    paths.forget(path)
+                    undo.append(lambda p=parent, n=node, i=index: reinsert(p, n, i))
+
+                elif kind == 'rename':
+                    node = paths.resolve(path)
+                    old_title = node.title
+                    node.title = op['title']
+                    paths.forget(path)
+                    undo.append(lambda n=node, t=old_title: setattr(n, 'title', t))
+
+                elif kind == 'add':
+                    parent, title = paths.resolve_parent(path)
+                    node = create_node(parent, op['node'])
+                    if node.title != title:
+                        node.title = title
+                    if find_title(parent, title) is not MISSING:
+                        raise ValueError('Title already exists in parent!')
+                    parent.validate_child(node)
+                    node.validate_parent(parent)
+
+                    parent.add_child(node)
+                    undo.append(lambda p=parent, n=node: p.remove_child(n))
+
+                else:
+                    raise ValueError('Invalid patch operation "{}"!'.format(kind))
+        except BaseException:
+            for func in reversed(undo):
+                func()
+            raise
+
+    return tree
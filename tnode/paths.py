@@ -0,0 +1,180 @@
+import weakref
+import functools
+
+
+__all__ = ['ESCAPE', 'delim_tails', 'escape_title', 'join_titles', 'split_path', 'TPath']
+
+
+ESCAPE = '\\'
+
+
+@functools.lru_cache(maxsize=64)
+def delim_tails(delim=' > '):
+    """Return the title endings that form the delimiter together with the start of the delimiter after them.
+
+    A title ending in one of these is escaped, because 'a >' + ' > ' + 'x' would otherwise be split at 'a'.
+    """
+    size = len(delim)
+    return tuple(delim[:i] for i in range(1, size) if delim[i:] == delim[:size - i])
+
+
+def escape_title(title, delim=' > '):
+    """Return the title with every delimiter escaped, so the title can be used in a full title.
+
+    A backslash before a character escapes it. Characters that start a delimiter in the title or at the end of the
+    title with the delimiter that follows it are escaped. A backslash is only doubled when it is followed by another
+    backslash, a delimiter character or the end of the title, so titles like 'C:\\dir' are not changed. Delimiters
+    that contain the backslash are not escaped.
+    """
+    if not delim or ESCAPE in delim:
+        return title
+    elif ESCAPE not in title and delim not in title and not title.endswith(delim_tails(delim)):
+        return title
+
+    size = len(title)
+    escaped = []
+    for i, char in enumerate(title):
+        if char == ESCAPE:
+            following = title[i + 1:i + 2]
+            if not following or following == ESCAPE or following in delim:
+                escaped.append(ESCAPE)
+        elif title.startswith(delim, i) or (size - i < len(delim) and (title[i:] + delim).startswith(delim)):
+            escaped.append(ESCAPE)
+        escaped.append(char)
+    return ''.join(escaped)
+
+
+def join_titles(titles, delim=' > '):
+    """Return the full title for the titles, escaping any delimiter in the titles."""
+    return delim.join([escape_title(t, delim) for t in titles])
+
+
+def split_path(full_title, delim=' > '):
+    """Split the full title into its titles, the reverse of join_titles.
+
+    The full title is read from left to right. A backslash followed by a backslash or a delimiter character is an
+    escaped character and any other backslash is a literal backslash.
+    """
+    if ESCAPE not in full_title or not delim or ESCAPE in delim:
+        return full_title.split(delim)
+
+    parts = []
+    title = []
+    i = 0
+    size = len(full_title)
+    while i < size:
+        char = full_title[i]
+        if char == ESCAPE:
+            following = full_title[i + 1:i + 2]
+            if following and (following == ESCAPE or following in delim):
+                title.append(following)
+                i += 2
+                continue
+        elif full_title.startswith(delim, i):
+            parts.append(''.join(title))
+            title = []
+            i += len(delim)
+            continue
+        title.append(char)
+        i += 1
+    parts.append(''.join(title))
+    return parts
+
+
+class TPath(object):
+    """Interned, immutable path of titles that can be used anywhere a full_title is accepted.
+
+    The titles are split once when the path is created and the hash is cached, so a TPath can be resolved many times
+    (find, get, __getitem__, __setitem__, add, ...) or used as a dictionary key without parsing a string again. Equal
+    paths are the same object while a reference to the path exists.
+
+    Args:
+        parts (iterable): Titles from the top level node to the node.
+
+    Example:
+
+        path = TPath.parse('a > b > c')
+        path.parts == ('a', 'b', 'c')
+        TPath(['a', 'b', 'c']) is path
+        tree.find(path)
+    """
+    __slots__ = ('parts', '_hash', '__weakref__')
+
+    _INTERNED = weakref.WeakValueDictionary()
+
+    def __new__(cls, parts=()):
+        if isinstance(parts, TPath):
+            return parts
+
+        parts = tuple(parts)
+        path = cls._INTERNED.get(parts, None)
+        if path is None:
+            path = object.__new__(cls)
+            object.__setattr__(path, 'parts', parts)
+            object.__setattr__(path, '_hash', hash(parts))
+            cls._INTERNED[parts] = path
+        return path
+
+    @classmethod
+    @functools.lru_cache(maxsize=4096)
+    def parse(cls, full_title, delim=' > '):
+        """Return the TPath for the full_title string. Recently parsed strings are not split again."""
+        return cls(split_path(full_title, delim))
+
+    def to_str(self, delim=' > '):
+        """Return the full_title string for this path."""
+        return join_titles(self.parts, delim)
+
+    @property
+    def title(self):
+        """Return the last title in the path."""
+        try:
+            return self.parts[-1]
+        except IndexError:
+            return ''
+
+    @property
+    def parent(self):
+        """Return the path of the parent."""
+        return TPath(self.parts[:-1])
+
+    def child(self, title):
+        """Return the path of a child with the given title."""
+        return TPath(self.parts + (title,))
+
+    def __setattr__(self, name, value):
+        raise AttributeError('TPath cannot be modified!')
+
+    def __reduce__(self):
+        return TPath, (self.parts,)
+
+    def __hash__(self):
+        return self._hash
+
+    def __eq__(self, other):
+        if isinstance(other, TPath):
+            return self is other or self.parts == other.parts
+        elif isinstance(other, tuple):
+            return self.parts == other
+        return NotImplemented
+
+    def __ne__(self, other):
+        eq = self.__eq__(other)
+        return eq if eq is NotImplemented else not eq
+
+    def __len__(self):
+        return len(self.parts)
+
+    def __iter__(self):
+        return iter(self.parts)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return TPath(self.parts[index])
+        return self.parts[index]
+
+    def __str__(self):
+        return self.to_str()
+
+    def __repr__(self):
+        return '{}({!r})'.format(self.__class__.__name__, self.parts)
@@ -0,0 +1,115 @@
+import time
+import threading
+
+
+__all__ = ['LOOKUP', 'PATH_SEGMENT', 'FULL_TITLE', 'ADD_CHILD', 'VALIDATE_CHILD', 'VALIDATE_PARENT',
+           'enable', 'disable', 'is_enabled', 'reset', 'stats', 'record', 'timer', 'profile']
+
+
+LOOKUP = 'lookup'
+PATH_SEGMENT = 'path_segment'
+FULL_TITLE = 'full_title'
+ADD_CHILD = 'add_child'
+VALIDATE_CHILD = 'validate_child'
+VALIDATE_PARENT = 'validate_parent'
+
+
+# Number of active enable() calls. TNode only records anything while this is not 0.
+ENABLED = 0
+
+_lock = threading.Lock()
+_counts = {}
+_times = {}
+
+
+def enable():
+    """Start counting and timing the core TNode operations. Calls to enable and disable can be nested."""
+    global ENABLED
+    with _lock:
+        ENABLED += 1
+
+
+def disable():
+    """Stop counting and timing once every enable() call has a matching disable() call."""
+    global ENABLED
+    with _lock:
+        if ENABLED > 0:
+            ENABLED -= 1
+
+
+def is_enabled():
+    """Return if operations are being recorded."""
+    return ENABLED > 0
+
+
+def reset():
+    """Clear all of the recorded counts and times."""
+    with _lock:
+        _counts.clear()
+        _times.clear()
+
+
+def stats():
+    """Return a snapshot dict of {operation: {'count': int, 'time': seconds}}.
+
+    Operations that are only counted (Example: 'path_segment') have a time of 0.
+    """
+    with _lock:
+        return {name: {'count': count, 'time': _times.get(name, 0.0)} for name, count in _counts.items()}
+
+
+def record(name, count=1, seconds=0.0):
+    """Add the count and time to the given operation."""
+    with _lock:
+        _counts[name] = _counts.get(name, 0) + count
+        if seconds:
+            _times[name] = _times.get(name, 0.0) + seconds
+
+
+class timer(object):
+    """Context manager that records one call of the operation and the time it took."""
+    __slots__ = ('name', 'start')
+
+    def __init__(self, name):
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        record(self.name, 1, time.perf_counter() - self.start)
+        return False
+
+
+class profile(object):
+    """Context manager that enables profiling and collects the operations that ran while it was active.
+
+    Example:
+
+        with TNode.profile() as prof:
+            tree.find('a > b > c')
+        print(prof.stats)  # {'lookup': {'count': 1, 'time': 1e-06}, 'path_segment': {'count': 2, 'time': 0.0}}
+
+    Operations from other threads that run at the same time are included as well.
+    """
+    def __init__(self):
+        self.stats = {}
+        self._start = {}
+
+    def __enter__(self):
+        enable()
+        self._start = stats()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        disable()
+        end = stats()
+        self.stats = {}
+        for name, value in end.items():
+            start = self._start.get(name, {'count': 0, 'time': 0.0})
+            count = value['count'] - start['count']
+            if count:
+                self.stats[name] = {'count': count, 'time': value['time'] - start['time']}
+        return False
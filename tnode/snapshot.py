@@ -0,0 +1,183 @@
+from .file_utils import FileWrapper
+from .filters import PathFilter
+from .paths import split_path
+from . import export
+
+
+__all__ = ['TSnapshot']
+
+
+MISSING = object()
+
+
+class TSnapshot(object):
+    """Immutable, structurally shared view of a tree created with TNode.snapshot().
+
+    Snapshots do not know their parent, because the same snapshot can be shared by several versions of the tree.
+    Full titles are relative to the snapshot that the lookup or export started from.
+    """
+    __slots__ = ('_title', '_children', '_data', '_has_data', '_delim', '_node_type')
+
+    def __init__(self, title, children=(), data=None, has_data=False, delim=' > ', node_type=None):
+        object.__setattr__(self, '_title', title)
+        object.__setattr__(self, '_children', tuple(children))
+        object.__setattr__(self, '_data', data)
+        object.__setattr__(self, '_has_data', has_data)
+        object.__setattr__(self, '_delim', delim)
+        object.__setattr__(self, '_node_type', node_type)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('Snapshots cannot be modified!')
+
+    def __delattr__(self, name):
+        raise AttributeError('Snapshots cannot be modified!')
+
+    @property
+    def title(self):
+        """Return the title of this node."""
+        return self._title
+
+    @property
+    def children(self):
+        """Return a tuple of child snapshots."""
+        return self._children
+
+    @property
+    def node_type(self):
+        """Return the TNode class that this snapshot was created from."""
+        return self._node_type
+
+    def get_delimiter(self):
+        return self._delim
+
+    def has_data(self):
+        """Return if this node has data."""
+        return self._has_data
+
+    def get_data(self):
+        """Return the data stored."""
+        return self._data
+
+    data = property(get_data)
+
+    def iter_children(self):
+        """Iterate through the direct children only."""
+        return iter(self._children)
+
+    def iter(self):
+        """Iterate through each child and their children."""
+        stack = [iter(self._children)]
+        while stack:
+            for child in stack[-1]:
+                yield child
+                if isinstance(child, TSnapshot) and child._children:
+                    stack.append(iter(child._children))
+                break
+            else:
+                stack.pop()
+
+    def iter_nearest(self):
+        """Iterate the nearest children first."""
+        children = self._children
+        while children:
+            sub = []
+            for child in children:
+                yield child
+                sub.extend(getattr(child, '_children', ()))
+            children = sub
+
+    def __iter__(self):
+        return self.iter()
+
+    def __len__(self):
+        return len(self._children)
+
+    def __bool__(self):
+        return True
+
+    def find(self, full_title):
+        """Find and return the child snapshot that may be several levels deep."""
+        node = self.get(full_title, MISSING)
+        if node is MISSING:
+            raise KeyError('"{}" not found in {}'.format(full_title, self))
+        return node
+
+    def get(self, full_title, default=None):
+        """Return the child snapshot for the full_title (str, TPath or tuple) or index or the default if missing."""
+        if isinstance(full_title, int):
+            if -len(self._children) <= full_title < len(self._children):
+                return self._children[full_title]
+            return default
+
+        if isinstance(full_title, str):
+            split = split_path(full_title, self._delim)
+        else:
+            split = tuple(full_title)  # TPath, tuple or list of titles
+        if split and split[0] == self._title:
+            split = split[1:]
+
+        node = self
+        for title in split:
+            for child in node._children:
+                if getattr(child, 'title', None) == title:
+                    node = child
+                    break
+            else:
+                return default
+        return node
+
+    def __getitem__(self, full_title):
+        if isinstance(full_title, int):
+            return self._children[full_title]
+        return self.find(full_title)
+
+    def __contains__(self, full_title):
+        try:
+            return self.get(full_title, MISSING) is not MISSING
+        except (TypeError, AttributeError):
+            return False
+
+    def __str__(self):
+        return '{}(title={!r})'.format(self.__class__.__name__, self._title)
+
+    def __repr__(self):
+        return '<{} at 0x{:016X}>'.format(self.__str__(), id(self))
+
+    def to_dict(self, exclude=None, include=None, max_depth=None, fields=None, **kwargs):
+        """Return this snapshot as a dictionary of data in the same format as TNode.to_dict.
+
+        Args:
+            exclude (list/set/callable)[None]: Full titles to exclude. See TNode.to_dict.
+            include (list/set/callable)[None]: Full titles to include. See TNode.to_dict.
+            max_depth (int)[None]: Number of levels below this node to include.
+            fields (list)[None]: Attribute names to save for each node. The default is ('title', 'data').
+
+        Returns:
+            tree (dict): Ex {'title': title, 'data': data if data, 'children': [{'title': title, 'data': data}]}
+        """
+        exclude = PathFilter.create(exclude, self._delim)
+        include = PathFilter.create(include, self._delim)
+        tree = export.to_dict(self, self._title, self._delim, exclude, include, max_depth, fields)
+        return tree if tree is not None else {}
+
+    def iter_dict(self, exclude=None, include=None, max_depth=None, fields=None):
+        """Iterate (full_title, fragment) for each node that to_dict would save. See TNode.iter_dict."""
+        exclude = PathFilter.create(exclude, self._delim)
+        include = PathFilter.create(include, self._delim)
+        return export.iter_dict(self, self._title, self._delim, exclude, include, max_depth, fields)
+
+    asdict = to_dict
+
+    def to_json(self, filename, **kwargs):
+        """Save this snapshot to a json file in the same format as TNode.to_json."""
+        import json
+        d = self.to_dict()
+
+        with FileWrapper(filename, 'w') as file:
+            json.dump(d, file, indent=2)
+
+        return filename
+
+    def to_tree(self):
+        """Create a new live tree from this snapshot using the node type that the snapshot was created from."""
+        return self._node_type.from_dict(self.to_dict())
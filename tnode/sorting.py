@@ -0,0 +1,51 @@
+__all__ = ['title_key', 'get_key_func', 'bisect_left', 'bisect_right', 'insort']
+
+
+def title_key(child):
+    """Sort key that sorts children by title."""
+    return getattr(child, 'title', '')
+
+
+def get_key_func(sort_key):
+    """Return the key function for a SORT_KEY value (None, 'title' or a callable)."""
+    if sort_key is None or callable(sort_key):
+        return sort_key
+    elif sort_key == 'title':
+        return title_key
+    raise ValueError('Invalid sort key {!r}! This must be None, "title" or a callable.'.format(sort_key))
+
+
+def bisect_left(items, value, key, lo=0, hi=None):
+    """Return the first index where key(item) >= value in the sorted items.
+
+    The bisect module only accepts a key function in Python 3.10+.
+    """
+    if hi is None:
+        hi = len(items)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if key(items[mid]) < value:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
+
+def bisect_right(items, value, key, lo=0, hi=None):
+    """Return the first index where key(item) > value in the sorted items."""
+    if hi is None:
+        hi = len(items)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if value < key(items[mid]):
+            hi = mid
+        else:
+            lo = mid + 1
+    return lo
+
+
+def insort(items, item, key):
+    """Insert the item after any items with an equal key and return the index."""
+    index = bisect_right(items, key(item), key)
+    items.insert(index, item)
+    return index